@@ -0,0 +1,53 @@
+# Ingestion-rate benchmark for Graph.add_edges_from.
+# Usage: python benchmarks/bench_ingest.py [num_edges]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph import Graph
+
+TARGET_EDGES_PER_SECOND = 250_000  # Bulk-path target for quiet (verbose=False) ingestion
+
+
+def grid_edges(num_edges):
+    # Edges of a square grid with roughly 'num_edges' undirected edges (weight 1).
+    side = max(2, int((num_edges / 2) ** 0.5))
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col
+            if col + 1 < side:
+                yield node, node + 1, 1
+            if row + 1 < side:
+                yield node, node + side, 1
+
+
+def measure(num_edges):
+    edges = list(grid_edges(num_edges))
+    graph = Graph(directed=False, verbose=False)
+    start = time.perf_counter()
+    graph.add_edges_from(edges)
+    bulk_seconds = time.perf_counter() - start
+
+    graph = Graph(directed=False, verbose=False)
+    start = time.perf_counter()
+    for edge in edges:
+        graph.add_edge(*edge)
+    single_seconds = time.perf_counter() - start
+    return len(edges), len(edges) / bulk_seconds, len(edges) / single_seconds
+
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    count, bulk_rate, single_rate = measure(num_edges)
+    print(f"edges: {count}")
+    print(f"add_edges_from: {bulk_rate:,.0f} edges/s")
+    print(f"add_edge loop (quiet): {single_rate:,.0f} edges/s")
+    status = "PASS" if bulk_rate >= TARGET_EDGES_PER_SECOND else "FAIL"
+    print(f"target {TARGET_EDGES_PER_SECOND:,} edges/s: {status}")
+    return 0 if status == "PASS" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
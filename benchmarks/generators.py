@@ -0,0 +1,92 @@
+# Seeded synthetic graph generators for the benchmark suite.
+# Each generator returns (directed, edges) with integer node labels 0..n-1 and
+# (node1, node2, weight) edges, ready for Graph.add_edges_from().
+import random
+
+
+def grid_maze(num_nodes, seed=0, loop_fraction=0.1):
+    # Perfect maze on a square grid (randomized Kruskal spanning tree) plus a few loops.
+    rng = random.Random(seed)
+    side = max(2, int(num_nodes ** 0.5))
+    walls = []
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col
+            if col + 1 < side:
+                walls.append((node, node + 1))
+            if row + 1 < side:
+                walls.append((node, node + side))
+    rng.shuffle(walls)
+
+    parent = list(range(side * side))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    edges = []
+    extra = []
+    for node1, node2 in walls:
+        root1, root2 = find(node1), find(node2)
+        if root1 != root2:
+            parent[root1] = root2
+            edges.append((node1, node2, rng.randint(1, 10)))
+        else:
+            extra.append((node1, node2, rng.randint(1, 10)))
+    edges.extend(extra[:int(len(extra) * loop_fraction)])
+    return False, edges
+
+
+def random_sparse(num_nodes, seed=0, average_degree=4):
+    # Random undirected graph with about 'average_degree' neighbors per node.
+    rng = random.Random(seed)
+    edges = [(rng.randrange(num_nodes), rng.randrange(num_nodes), rng.randint(1, 10))
+             for _ in range(num_nodes * average_degree // 2)]
+    edges.extend((node, node + 1, rng.randint(1, 10)) for node in range(num_nodes - 1))  # Keep it connected
+    return False, [edge for edge in edges if edge[0] != edge[1]]
+
+
+def random_dense(num_nodes, seed=0, density=0.2):
+    # Random undirected graph where each pair is an edge with probability 'density'.
+    rng = random.Random(seed)
+    edges = [(node1, node2, rng.randint(1, 10))
+             for node1 in range(num_nodes) for node2 in range(node1 + 1, num_nodes)
+             if rng.random() < density]
+    return False, edges
+
+
+def corridor(num_nodes, seed=0):
+    # One long path: the worst case for recursive traversals.
+    rng = random.Random(seed)
+    return False, [(node, node + 1, rng.randint(1, 10)) for node in range(num_nodes - 1)]
+
+
+def directed_sccs(num_nodes, seed=0, scc_size=10):
+    # Directed cycles of 'scc_size' nodes, chained by forward edges between cycles.
+    rng = random.Random(seed)
+    edges = []
+    for first in range(0, num_nodes, scc_size):
+        last = min(first + scc_size, num_nodes) - 1
+        for node in range(first, last):
+            edges.append((node, node + 1, rng.randint(1, 10)))
+        if last > first:
+            edges.append((last, first, rng.randint(1, 10)))
+        if last + 1 < num_nodes:
+            edges.append((rng.randint(first, last), last + 1, rng.randint(1, 10)))
+    for _ in range(num_nodes // scc_size):  # Extra forward edges only, so the SCCs stay intact
+        node1 = rng.randrange(num_nodes)
+        node2 = rng.randrange(node1 - node1 % scc_size + scc_size, num_nodes + scc_size)
+        if node2 < num_nodes:
+            edges.append((node1, node2, rng.randint(1, 10)))
+    return True, edges
+
+
+GENERATORS = {
+    'grid_maze': grid_maze,
+    'random_sparse': random_sparse,
+    'random_dense': random_dense,
+    'corridor': corridor,
+    'directed_sccs': directed_sccs,
+}
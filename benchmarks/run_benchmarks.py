@@ -0,0 +1,155 @@
+# Scaling benchmarks for every Graph algorithm on seeded synthetic graphs.
+#
+#   python benchmarks/run_benchmarks.py --output results.json
+#   python benchmarks/run_benchmarks.py --max-size 1000000 --output results.json
+#   python benchmarks/run_benchmarks.py --baseline baseline.json   # exit 1 on regressions
+#
+# Results are JSON: one record per (generator, size, algorithm) with wall time,
+# peak traced memory of the call and an error message if the algorithm failed.
+# baseline.json is a default-settings run; regenerate it on the machine you compare on.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generators import GENERATORS
+from graph import Graph
+
+SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+MAX_DENSE_SIZE = 10 ** 3  # random_dense has O(n^2) edges
+ALL_PATHS_LIMIT = 100  # Simple-path enumeration is exponential: time the first paths only
+# Largest size per (algorithm, generator) where the run is still bounded; all_paths explores
+# every simple prefix that cannot reach the target, which explodes on loopy graphs.
+SIZE_LIMITS = {
+    ('all_paths', 'grid_maze'): 10 ** 2,
+    ('all_paths', 'random_dense'): 10 ** 2,
+    ('all_paths', 'random_sparse'): 10 ** 3,
+}
+
+# name -> (function(graph, source, target), needs an undirected graph)
+ALGORITHMS = {
+    'find_shortest_path': (lambda graph, source, target: graph.find_shortest_path(source, target), False),
+    'all_paths': (lambda graph, source, target: list(graph.iter_paths(source, target, max_paths=ALL_PATHS_LIMIT)), False),
+    'bfs': (lambda graph, source, target: graph.bfs(source, target), False),
+    'dfs': (lambda graph, source, target: graph.dfs(source, target), False),
+    'graph_coloring': (lambda graph, source, target: graph.graph_coloring(), True),
+    'dsatur_coloring': (lambda graph, source, target: graph.graph_coloring('dsatur'), True),
+    'connected_components': (lambda graph, source, target: graph.connected_components(), True),
+    'tarjan_scc': (lambda graph, source, target: graph.tarjan_scc(), False),
+}
+
+
+def measure(function, measure_memory, repeat=3):
+    # (best-of-'repeat' seconds, peak traced bytes or None, error or None).
+    try:
+        seconds = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            seconds = min(seconds, time.perf_counter() - started)
+    except Exception as error:  # Record failures (e.g. colorings that run out of colors)
+        return None, None, f"{type(error).__name__}: {error}"
+    peak = None
+    if measure_memory:  # Separate run: tracing slows the call down too much to time it
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak, None
+
+
+def run(generators, algorithms, sizes, seed, measure_memory, repeat=3):
+    results = []
+    for generator_name in generators:
+        for size in sizes:
+            if generator_name == 'random_dense' and size > MAX_DENSE_SIZE:
+                continue
+            directed, edges = GENERATORS[generator_name](size, seed)
+            graph = Graph(directed=directed, verbose=False, cache_size=0)  # Time the algorithms, not cache hits
+            graph.add_nodes_from(range(size))
+            graph.add_edges_from(edges)
+            source, target = 0, max(graph.graph)
+            for algorithm in algorithms:
+                function, undirected_only = ALGORITHMS[algorithm]
+                if undirected_only and directed:
+                    continue
+                if size > SIZE_LIMITS.get((algorithm, generator_name), size):
+                    continue
+                seconds, peak, error = measure(lambda: function(graph, source, target), measure_memory, repeat)
+                record = {'generator': generator_name, 'size': size, 'nodes': len(graph.graph),
+                          'algorithm': algorithm, 'seconds': seconds, 'peak_bytes': peak, 'error': error}
+                results.append(record)
+                print(_format(record), flush=True)
+    return results
+
+
+def compare(results, baseline, threshold, min_delta=0.002):
+    # Records whose time grew by more than 'threshold' (ratio) and 'min_delta' seconds against the baseline.
+    previous = {(r['generator'], r['size'], r['algorithm']): r for r in baseline['results']}
+    regressions = []
+    for record in results:
+        old = previous.get((record['generator'], record['size'], record['algorithm']))
+        if not old or old['seconds'] is None or record['seconds'] is None:
+            continue
+        ratio = record['seconds'] / max(old['seconds'], 1e-9)
+        if ratio > threshold and record['seconds'] - old['seconds'] > min_delta:
+            regressions.append((record, old, ratio))
+    return regressions
+
+
+def _format(record):
+    if record['error']:
+        outcome = record['error']
+    else:
+        memory = f"{record['peak_bytes'] / 1e6:9.2f} MB" if record['peak_bytes'] is not None else ''
+        outcome = f"{record['seconds'] * 1000:10.2f} ms {memory}"
+    return f"{record['generator']:>14} {record['size']:>8} {record['algorithm']:>21}  {outcome}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph algorithm scaling benchmarks.")
+    parser.add_argument('--generators', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument('--max-size', type=int, default=10 ** 4, help="largest size to run (sizes are powers of 10)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per measurement (best is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak-memory runs")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=1.5, help="slowdown ratio reported as a regression")
+    parser.add_argument('--min-delta', type=float, default=0.002, help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    sizes = [size for size in SIZES if size <= args.max_size]
+    results = run(args.generators, args.algorithms, sizes, args.seed, not args.no_memory, args.repeat)
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': args.seed, 'repeat': args.repeat},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold, args.min_delta)
+        for record, old, ratio in regressions:
+            print(f"REGRESSION {record['generator']} {record['size']} {record['algorithm']}: "
+                  f"{old['seconds'] * 1000:.2f} ms -> {record['seconds'] * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
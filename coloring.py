@@ -0,0 +1,121 @@
+import time
+
+import instrumentation
+
+
+# Greedy graph coloring with an unbounded palette.
+# 'neighbors' is a callable node -> iterable of neighbors (as in traversal.py).
+# Colors are tracked as one-bit ints: a node's forbidden colors are the OR of its
+# colored neighbors' bits, and the lowest free color is the lowest zero bit of that
+# mask, so choosing a color is a couple of int operations instead of a set per node.
+#   'sequential'    - nodes in the given order (the original Graph.graph_coloring order)
+#   'largest_first' - highest degree first
+#   'smallest_last' - reverse of the order that repeatedly strips a minimum-degree node
+#                     (uses at most degeneracy + 1 colors)
+#   'dsatur'        - next node is the one with the most distinct neighbor colors
+STRATEGIES = ('sequential', 'largest_first', 'smallest_last', 'dsatur')
+
+
+def greedy_color(nodes, neighbors, strategy='sequential'):
+    # Returns {node: color} with colors 0, 1, 2, ...; adjacent nodes never share a color.
+    if strategy == 'sequential':
+        order = nodes
+    elif strategy == 'largest_first':
+        order = sorted(nodes, key=lambda node: len(neighbors(node)), reverse=True)
+    elif strategy == 'smallest_last':
+        order = _smallest_last_order(nodes, neighbors)
+    elif strategy == 'dsatur':
+        return _to_colors(_dsatur_bits(nodes, neighbors))
+    else:
+        raise ValueError(f"Unknown coloring strategy: {strategy!r}")
+    return _to_colors(_color_bits_in_order(order, neighbors))
+
+
+def report(nodes, neighbors, strategy='sequential'):
+    # Color the graph and return {'strategy', 'colors' (count), 'seconds', 'coloring'}.
+    started = time.perf_counter()
+    coloring = greedy_color(nodes, neighbors, strategy)
+    seconds = time.perf_counter() - started
+    return {'strategy': strategy, 'colors': max(coloring.values(), default=-1) + 1,
+            'seconds': seconds, 'coloring': coloring}
+
+
+def _color_bits_in_order(order, neighbors):
+    bits = {}  # node -> 1 << color
+    bit_of = bits.get
+    for node in order:
+        used = 0
+        for neighbor in neighbors(node):
+            used |= bit_of(neighbor, 0)
+        bits[node] = ~used & (used + 1)  # Lowest zero bit of 'used'
+    return bits
+
+
+def _smallest_last_order(nodes, neighbors):
+    # Bucket queue over current degrees with lazy deletion: O(V + E).
+    degree = {node: len(neighbors(node)) for node in nodes}
+    buckets = [[] for _ in range(max(degree.values(), default=0) + 1)]
+    for node, d in degree.items():
+        buckets[d].append(node)
+    removed = set()
+    order = []
+    lowest = 0
+    while len(order) < len(degree):
+        bucket = buckets[lowest]
+        if not bucket:
+            lowest += 1
+            continue
+        node = bucket.pop()
+        if node in removed or degree[node] != lowest:
+            continue  # Stale entry: the node moved to a lower bucket or is gone
+        removed.add(node)
+        order.append(node)
+        for neighbor in neighbors(node):
+            if neighbor not in removed and neighbor in degree:
+                d = degree[neighbor] - 1
+                degree[neighbor] = d
+                buckets[d].append(neighbor)
+                if d < lowest:
+                    lowest = d
+    order.reverse()
+    return order
+
+
+def _dsatur_bits(nodes, neighbors):
+    # Saturation never exceeds the number of colors used, so a bucket queue (one list per
+    # saturation, lazy deletion) replaces the heap: O(V + E). Ties go to the highest
+    # degree for the initial bucket and to the most recently saturated node after that.
+    bits = {}
+    forbidden = dict.fromkeys(nodes, 0)  # OR of the colored neighbors' bits
+    saturation = dict.fromkeys(nodes, 0)
+    buckets = [sorted(nodes, key=lambda node: len(neighbors(node)))]  # pop() takes the end
+    highest = 0
+    pushes = 0
+    while highest >= 0:
+        bucket = buckets[highest]
+        if not bucket:
+            highest -= 1
+            continue
+        node = bucket.pop()
+        if node in bits or saturation[node] != highest:
+            continue  # Stale entry
+        used = forbidden[node]
+        bit = ~used & (used + 1)
+        bits[node] = bit
+        for neighbor in neighbors(node):
+            if neighbor not in bits and neighbor in forbidden and not forbidden[neighbor] & bit:
+                forbidden[neighbor] |= bit
+                level = saturation[neighbor] + 1
+                saturation[neighbor] = level
+                if level == len(buckets):
+                    buckets.append([])
+                buckets[level].append(neighbor)
+                pushes += 1
+                if level > highest:
+                    highest = level
+    instrumentation.count('coloring.bucket_pushes', pushes)
+    return bits
+
+
+def _to_colors(bits):
+    return {node: bit.bit_length() - 1 for node, bit in bits.items()}
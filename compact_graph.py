@@ -0,0 +1,507 @@
+import heapq
+import mmap
+import struct
+import sys
+from array import array
+from collections import deque
+
+import traversal
+
+
+class CompactGraph:
+    # Read-only CSR snapshot of a Graph for read-heavy analysis.
+    # Node labels are interned to ints 0..n-1; the neighbors of node i are
+    # targets[offsets[i]:offsets[i + 1]] with matching entries in 'weights'.
+    # Labels that already are 0..n-1 in order are kept as a range with no index dict;
+    # any other label -> id index is built on first use.
+
+    # Binary file layout (little-endian), each section 8-byte aligned:
+    #   header   FILE_HEADER: magic, version, flags, num_nodes, num_entries, label_bytes,
+    #            then one element type per section ('i' int32, 'q' int64, 'd' float64)
+    #   offsets  [num_nodes + 1]
+    #   targets  [num_entries]
+    #   weights  [num_entries]
+    #   labels   label type 'r': none (labels are 0..num_nodes-1),
+    #            'i'/'q': [num_nodes] integer labels,
+    #            's': int64 [num_nodes + 1] offsets into a UTF-8 blob of 'label_bytes' bytes
+    FILE_MAGIC = b'GTDM'
+    FILE_VERSION = 1
+    FILE_HEADER = struct.Struct('<4sHHQQQ4s')
+    FLAG_DIRECTED = 1
+
+    def __init__(self, labels, offsets, targets, weights, directed=False, index=None):
+        self.labels = labels  # id -> label
+        self._index = index  # label -> id, built on first use
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+        self._mmap = None  # Backing file mapping when opened with CompactGraph.open()
+        self._reverse = None  # Reversed-edge CSR, built on demand
+
+
+    @property
+    def index(self):
+        if self._index is None:
+            if isinstance(self.labels, range):
+                self._index = _IdentityIndex(len(self.labels))
+            else:
+                self._index = {label: i for i, label in enumerate(self.labels)}
+        return self._index
+
+
+    @classmethod
+    def from_graph(cls, graph):
+        # Build the snapshot from a Graph (labels keep the graph's iteration order).
+        labels = list(graph.graph)
+        num_keys = len(labels)
+        index = None  # Not needed while the labels are 0..n-1 in order
+        if not all(type(label) is int and label == node_id for node_id, label in enumerate(labels)):
+            index = {label: i for i, label in enumerate(labels)}
+        all_int = all(type(weight) is int for weight in graph.weights.values())
+
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('q' if all_int else 'd')
+        node_id = 0
+        while node_id < len(labels):  # 'labels' may grow: directed edges can point at non-key nodes
+            node = labels[node_id]
+            for neighbor in graph.graph.get(node, ()):
+                if index is None:
+                    if type(neighbor) is int and 0 <= neighbor < num_keys:
+                        targets.append(neighbor)
+                        weights.append(graph.weights[(node, neighbor)])
+                        continue
+                    index = {label: i for i, label in enumerate(labels)}  # A target outside 0..n-1
+                neighbor_id = index.get(neighbor)
+                if neighbor_id is None:
+                    neighbor_id = index[neighbor] = len(labels)
+                    labels.append(neighbor)
+                targets.append(neighbor_id)
+                weights.append(graph.weights[(node, neighbor)])
+            offsets.append(len(targets))
+            node_id += 1
+
+        if index is None:
+            labels = range(len(labels))
+        if all_int:
+            weights = _narrowed(weights)
+        return cls(labels, _narrowed(offsets), _narrowed(targets), weights, directed=graph.directed)
+
+
+    def to_graph(self, verbose=False):
+        # Mutable Graph copy of this snapshot.
+        from graph import Graph  # Local import: graph.py imports this module
+        graph = Graph(directed=self.directed, verbose=verbose)
+        graph.add_nodes_from(self.labels)
+        graph.add_edges_from(self.edges())
+        return graph
+
+
+    def edges(self):
+        # Yield every stored adjacency entry as (label1, label2, weight).
+        labels, offsets, targets, weights = self.labels, self.offsets, self.targets, self.weights
+        for u in range(len(labels)):
+            label = labels[u]
+            for i in range(offsets[u], offsets[u + 1]):
+                yield label, labels[targets[i]], weights[i]
+
+
+#-----------------------------Binary file format:
+
+    def save(self, filename):
+        # Write the snapshot in the versioned binary format, each section in the narrowest element type.
+        # Labels must be all int or all str (ValueError otherwise) so they load back unchanged.
+        flags = self.FLAG_DIRECTED if self.directed else 0
+        num_nodes = len(self.labels)
+        offsets = _narrowed(self.offsets)
+        targets = _narrowed(self.targets)
+        weights = self.weights if _typecode(self.weights) == 'd' else _narrowed(self.weights)
+
+        label_bytes = 0
+        if isinstance(self.labels, range) or all(type(label) is int for label in self.labels):
+            if all(label == node_id for node_id, label in enumerate(self.labels)):
+                label_type, label_sections = 'r', []
+            else:
+                label_sections = [_narrowed(array('q', self.labels))]
+                label_type = _typecode(label_sections[0])
+        elif all(type(label) is str for label in self.labels):
+            encoded = [label.encode('utf-8') for label in self.labels]
+            label_offsets = array('q', [0])
+            for chunk in encoded:
+                label_offsets.append(label_offsets[-1] + len(chunk))
+            label_type, label_sections = 's', [label_offsets, b''.join(encoded)]
+            label_bytes = label_offsets[-1]
+        else:
+            # Anything else (tuples, mixed types, ...) would not come back as the same label
+            raise ValueError("Binary graph files need node labels that are all str or all int")
+
+        types = (_typecode(offsets) + _typecode(targets) + _typecode(weights) + label_type).encode('ascii')
+        with open(filename, 'wb') as file:
+            file.write(self.FILE_HEADER.pack(self.FILE_MAGIC, self.FILE_VERSION, flags,
+                                             num_nodes, len(targets), label_bytes, types))
+            for section in [offsets, targets, weights] + label_sections:
+                file.write(b'\0' * (-file.tell() % 8))
+                file.write(section if isinstance(section, bytes) else _little_endian(section))
+
+
+    @classmethod
+    def open(cls, filename):
+        # Memory-map a file written by save(). Arrays are zero-copy views into the mapping,
+        # labels are decoded on access and the label index is only built when needed.
+        with open(filename, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags = cls.FILE_HEADER.unpack_from(mapping)[:3]
+        if magic != cls.FILE_MAGIC:
+            mapping.close()
+            raise ValueError(f"{filename} is not a binary graph file")
+        if version != cls.FILE_VERSION:
+            mapping.close()
+            raise ValueError(f"Unsupported binary graph version {version} in {filename}")
+        compact = cls(*cls._sections(mapping), directed=bool(flags & cls.FLAG_DIRECTED))
+        compact._mmap = mapping
+        return compact
+
+
+    @classmethod
+    def _sections(cls, mapping):
+        # (labels, offsets, targets, weights) as views into an open mapping of a save() file.
+        _, _, _, num_nodes, num_entries, label_bytes, types = cls.FILE_HEADER.unpack_from(mapping)
+        offsets_type, targets_type, weights_type, label_type = types.decode('ascii')
+        view = memoryview(mapping)
+        position = cls.FILE_HEADER.size
+
+        def section(count, typecode):
+            nonlocal position
+            position += -position % 8
+            size = count * array(typecode).itemsize if typecode else count
+            raw = view[position:position + size]
+            position += size
+            if not typecode:
+                return raw
+            if sys.byteorder == 'little':
+                return raw.cast(typecode)
+            values = array(typecode, raw.tobytes())  # Big-endian host: one byteswapped copy
+            values.byteswap()
+            return values
+
+        offsets = section(num_nodes + 1, offsets_type)
+        targets = section(num_entries, targets_type)
+        weights = section(num_entries, weights_type)
+        if label_type == 'r':
+            labels = range(num_nodes)
+        elif label_type == 's':
+            labels = _LabelTable(section(num_nodes + 1, 'q'), section(label_bytes, None))
+        else:
+            labels = section(num_nodes, label_type)
+        return labels, offsets, targets, weights
+
+
+    def close(self):
+        # Release the file mapping of a graph returned by CompactGraph.open().
+        # Views from as_numpy() must be dropped first: while one is alive the mapping cannot
+        # be closed, and close() raises BufferError with the graph still open and usable.
+        if self._mmap is None:
+            return
+        self.labels = self.offsets = self.targets = self.weights = None
+        self._index = self._reverse = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            self.labels, self.offsets, self.targets, self.weights = self._sections(self._mmap)
+            raise BufferError("CompactGraph.close(): drop the views returned by as_numpy() first") from None
+        self._mmap = None
+
+
+    def __len__(self):
+        return len(self.labels)
+
+
+    def __contains__(self, node):
+        return node in self.index
+
+
+    def edge_count(self):
+        # Number of stored adjacency entries (each undirected edge counts twice, like Graph.graph).
+        return len(self.targets)
+
+
+    def neighbors(self, node):
+        # Neighbor labels of 'node' (empty if unknown).
+        node_id = self.index.get(node)
+        if node_id is None:
+            return []
+        return [self.labels[v] for v in self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]]
+
+
+    def node_degree(self, node):
+        node_id = self.index.get(node)
+        if node_id is None:
+            return 0
+        return self.offsets[node_id + 1] - self.offsets[node_id]
+
+
+    def nbytes(self):
+        # Bytes held by the CSR buffers (labels and the label index are not included).
+        return sum(buf.itemsize * len(buf) for buf in (self.offsets, self.targets, self.weights))
+
+
+    def as_numpy(self):
+        # Zero-copy NumPy views of (offsets, targets, weights). NumPy is optional.
+        # For a graph from CompactGraph.open(), drop the views before calling close().
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("CompactGraph.as_numpy() requires numpy")
+        dtypes = {'i': np.int32, 'q': np.int64, 'd': np.float64}
+        return tuple(np.frombuffer(buf, dtype=dtypes[_typecode(buf)])
+                     for buf in (self.offsets, self.targets, self.weights))
+
+
+#-----------------------------Algorithms (same contracts as Graph):
+
+    def find_shortest_path(self, start, end):
+        # Dijkstra over the CSR arrays. Returns (path, distance); ([end], inf) if unreachable.
+        source = self.index.get(start)
+        target = self.index.get(end)
+        if source is None or target is None:
+            return ([start], 0) if start == end else ([end], float('inf'))
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        inf = float('inf')
+        distances = [inf] * len(self.labels)
+        previous_nodes = [-1] * len(self.labels)
+        settled = bytearray(len(self.labels))
+        distances[source] = 0
+        heap = [(0, source)]
+
+        while heap:
+            dist, u = heapq.heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            if u == target:
+                break
+            lo, hi = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[lo:hi], weights[lo:hi]):
+                alternative_route = dist + weight
+                if alternative_route < distances[v]:
+                    distances[v] = alternative_route
+                    previous_nodes[v] = u
+                    heapq.heappush(heap, (alternative_route, v))
+
+        if distances[target] == inf:
+            return [end], inf
+        path, current = [], target
+        while current != -1:
+            path.append(self.labels[current])
+            current = previous_nodes[current]
+        path.reverse()
+        return path, distances[target]
+
+
+    def bfs(self, start, end):
+        # Visitation order from 'start' until 'end' is reached (same contract as Graph.bfs).
+        source = self.index.get(start)
+        target = self.index.get(end)
+        if source is None:
+            return [start] if start == end else []
+
+        offsets, targets = self.offsets, self.targets
+        visited = bytearray(len(self.labels))
+        visited[source] = 1
+        queue = deque([source])
+        order = []
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            if u == target:
+                return [self.labels[v] for v in order]
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if not visited[v]:
+                    visited[v] = 1
+                    queue.append(v)
+        return []
+
+
+    def bfs_path(self, start, end, mode='standard'):
+        # Unweighted shortest path from 'start' to 'end' ([] if unreachable).
+        # Modes as in Graph.bfs_path: 'standard', 'bidirectional' or 'frontier'.
+        source = self.index.get(start)
+        target = self.index.get(end)
+        if start == end:
+            return [start]
+        if source is None or target is None:
+            return []
+
+        if mode == 'standard':
+            path = traversal.bfs_path(self._neighbors, source, target)
+        elif mode == 'bidirectional':
+            predecessors = self._reversed()._neighbors if self.directed else self._neighbors
+            path = traversal.bidirectional_bfs_path(self._neighbors, predecessors, source, target)
+        elif mode == 'frontier':
+            path = self._frontier_bfs_path(source, target)
+        else:
+            raise ValueError(f"Unknown BFS mode: {mode!r}")
+        return [self.labels[v] for v in path]
+
+
+    def _frontier_bfs_path(self, source, target):
+        # Level-synchronous BFS: each step expands the whole frontier at once.
+        # With NumPy the gather/filter of every level is vectorized over the CSR arrays.
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        if np is None:
+            parents = {source: None}
+            frontier = [source]
+            while frontier and target not in parents:
+                next_frontier = []
+                for u in frontier:
+                    for v in self._neighbors(u):
+                        if v not in parents:
+                            parents[v] = u
+                            next_frontier.append(v)
+                frontier = next_frontier
+            return traversal._walk_back(parents, target) if target in parents else []
+
+        offsets, targets, _ = self.as_numpy()
+        parents = np.full(len(self.labels), -1, dtype=np.int64)
+        parents[source] = source
+        frontier = np.array([source], dtype=np.int64)
+        while frontier.size and parents[target] == -1:
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+            # Positions of every out-edge of the frontier, concatenated
+            edge_starts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            neighbors = targets[edge_starts + np.arange(total)]
+            sources = np.repeat(frontier, counts)
+            fresh = parents[neighbors] == -1
+            neighbors, first = np.unique(neighbors[fresh], return_index=True)
+            parents[neighbors] = sources[fresh][first]
+            frontier = neighbors
+
+        if parents[target] == -1:
+            return []
+        path = [target]
+        while path[-1] != source:
+            path.append(int(parents[path[-1]]))
+        path.reverse()
+        return path
+
+
+    def _reversed(self):
+        # CSR of the reversed edges (cached; only needed for directed graphs).
+        if self._reverse is None:
+            n = len(self.labels)
+            counts = [0] * (n + 1)
+            for v in self.targets:
+                counts[v + 1] += 1
+            offsets = array('q', [0] * (n + 1))
+            for i in range(n):
+                offsets[i + 1] = offsets[i] + counts[i + 1]
+            fill = list(offsets[:n])
+            targets = array('q', [0]) * len(self.targets)
+            weights = array(_typecode(self.weights), [0]) * len(self.targets)
+            for u in range(n):
+                for i in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[i]
+                    targets[fill[v]] = u
+                    weights[fill[v]] = self.weights[i]
+                    fill[v] += 1
+            self._reverse = CompactGraph(self.labels, offsets, targets, weights, directed=True, index=self._index)
+        return self._reverse
+
+
+    def dfs(self, start, end):
+        # Depth-first path from 'start' to 'end' (same contract as Graph.dfs).
+        source = self.index.get(start)
+        target = self.index.get(end)
+        if start == end:
+            return [start]
+        if source is None or target is None:
+            return []
+        return [self.labels[v] for v in traversal.dfs_path(self._neighbors, source, target)]
+
+
+    def _neighbors(self, node_id):
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+
+    def connected_components(self):
+        # Connected components as lists of labels, each in DFS preorder.
+        components = traversal.connected_components(range(len(self.labels)), self._neighbors)
+        return [[self.labels[v] for v in component] for component in components]
+
+
+    def tarjan_scc(self):
+        # Strongly connected components (Tarjan's algorithm, shared explicit-stack engine).
+        sccs = traversal.strongly_connected_components(range(len(self.labels)), self._neighbors)
+        return [[self.labels[v] for v in scc] for scc in sccs]
+
+
+class _LabelTable:
+    # Lazily decoded view of the UTF-8 label blob of a memory-mapped graph file.
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node_id):
+        return str(self.blob[self.offsets[node_id]:self.offsets[node_id + 1]], 'utf-8')
+
+    def __iter__(self):
+        for node_id in range(len(self)):
+            yield self[node_id]
+
+
+class _IdentityIndex:
+    # label -> id for labels 0..n-1 (a range): every label is its own id.
+
+    def __init__(self, size):
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, label):
+        return type(label) is int and 0 <= label < self.size
+
+    def __getitem__(self, label):
+        if label not in self:
+            raise KeyError(label)
+        return label
+
+    def get(self, label, default=None):
+        return label if label in self else default
+
+    def __iter__(self):
+        return iter(range(self.size))
+
+
+def _typecode(buffer):
+    # Element type of an array.array or a cast memoryview ('q' or 'd').
+    return buffer.typecode if isinstance(buffer, array) else buffer.format
+
+
+def _narrowed(values):
+    # int32 copy of an integer array when every value fits, otherwise the array itself.
+    if len(values) == 0 or (-2 ** 31 <= min(values) and max(values) < 2 ** 31):
+        return array('i', values)
+    return values
+
+
+def _little_endian(values):
+    if sys.byteorder == 'little':
+        return values
+    swapped = array(_typecode(values), values)
+    swapped.byteswap()
+    return swapped
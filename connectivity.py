@@ -0,0 +1,363 @@
+from collections import deque
+
+import instrumentation
+from cow_graph import CowDict
+
+
+class DynamicConnectivity:
+    # Bridge index for an undirected Graph, kept in sync through Graph.subscribe().
+    #
+    # Nodes are grouped into 2-edge-connected groups (a union-find); the groups form
+    # a forest whose links are exactly the bridges of the graph. An existing edge is
+    # a bridge iff its endpoints sit in different groups, so "would removing this
+    # edge disconnect the maze?" is a union-find lookup instead of a full DFS.
+    #  - add_edge merges the groups along the forest path between its endpoints,
+    #  - removing a non-bridge peels off the pieces of its group that it cut loose,
+    #  - removing a bridge relabels the connected component that was cut in two.
+    # Tokens of groups that were merged away or emptied by splits are dropped by _compact()
+    # once they outnumber the nodes, so memory follows the maze size, not the turn count.
+
+    def __init__(self, graph):
+        if graph.directed:
+            raise ValueError("DynamicConnectivity needs an undirected graph")
+        self.graph = graph
+        self._group = {}  # 2-edge-connected union-find parent: node -> group token -> ... -> root token
+        self._size = {}  # root token -> number of nodes in the group
+        self._tokens = 0  # Group tokens in _group, live (roots) or dead
+        self._up = {}  # root token -> (node inside, node in parent group): bridge toward the forest root
+        self._component = {}  # connected-component union-find parent
+        self._component_size = {}  # component representative -> number of nodes
+
+        position = {node: i for i, node in enumerate(graph.graph)}
+        for node, neighbors in graph.graph.items():
+            for neighbor in neighbors:
+                if position[node] < position[neighbor]:  # Each undirected edge once
+                    self._link(node, neighbor)
+        self._flat_version = None  # Graph version at the last _flatten()
+        graph.subscribe(self)
+
+
+    def copy(self, graph):
+        # Index for 'graph', an unchanged copy (e.g. a CowGraph) of this index's graph.
+        # The copy shares this index's union-find state through CowDicts and only stores
+        # what its own graph changes touch, so this index must not change afterwards.
+        self._flatten()
+        clone = DynamicConnectivity.__new__(DynamicConnectivity)
+        clone.graph = graph
+        clone._flat_version = None
+        clone._group = CowDict(self._group)
+        clone._size = CowDict(self._size)
+        clone._tokens = self._tokens
+        clone._up = CowDict(self._up)
+        clone._component = CowDict(self._component)
+        clone._component_size = CowDict(self._component_size)
+        graph.subscribe(clone)
+        return clone
+
+
+#-----------------------------Queries:
+
+    def is_bridge(self, node1, node2):
+        # True if the edge exists and removing it would disconnect its endpoints.
+        if (node1, node2) not in self.graph.weights or node1 == node2:
+            return False
+        return self._find_group(node1) != self._find_group(node2)
+
+
+    def connected(self, node1, node2):
+        # True if both nodes are in the same connected component.
+        if node1 == node2:
+            return True
+        if node1 not in self._component or node2 not in self._component:
+            return False
+        return self._find(self._component, node1) == self._find(self._component, node2)
+
+
+#-----------------------------Graph listener hooks:
+
+    def on_edge_added(self, node1, node2, weight):
+        if node1 != node2:
+            self._link(node1, node2)
+            self._maybe_compact()
+
+
+    def on_edge_removed(self, node1, node2):
+        if node1 == node2:
+            return
+        group1 = self._find_group(node1)
+        group2 = self._find_group(node2)
+        if group1 == group2:
+            self._split_group(group1, node1, node2)
+        else:
+            self._cut_bridge(node1, node2, group1, group2)
+        self._maybe_compact()
+
+
+#-----------------------------Union-find helpers:
+
+    def _ensure(self, node):
+        if node not in self._group:
+            self._group[node] = self._new_group(1)
+            self._component[node] = node
+            self._component_size[node] = 1
+
+
+    def _new_group(self, size):
+        # Groups are tokens, not nodes: parent chains never pass through a node, so a
+        # split can relabel just the nodes that move out without cutting other chains.
+        group = object()
+        self._group[group] = group
+        self._size[group] = size
+        self._tokens += 1
+        return group
+
+
+    def _maybe_compact(self):
+        if self._tokens - len(self._size) > len(self._component):
+            self._compact()
+
+
+    def _compact(self):
+        # Point every node straight at its root token and forget all other tokens: O(V),
+        # run once the dead tokens outnumber the nodes, so O(1) amortized per token.
+        instrumentation.count('connectivity.compactions')
+        group = {}
+        for node in self._component:
+            root = self._find(self._group, node)
+            group[node] = group[root] = root
+        self._group = group
+        self._tokens = len(self._size)
+
+
+    def _find(self, parent, node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:  # Path compression
+            parent[node], node = root, parent[node]
+        return root
+
+
+    def _flatten(self):
+        # Compress every node's path (once per graph version), so that copies sharing the
+        # union-find do not each store their own path compressions.
+        if self._flat_version != self.graph.version:
+            for node in self.graph.graph:
+                if node in self._group:
+                    self._find(self._group, node)
+            self._flat_version = self.graph.version
+
+
+    def _find_group(self, node):
+        self._ensure(node)
+        return self._find(self._group, node)
+
+
+#-----------------------------Edge insertion:
+
+    def _link(self, node1, node2):
+        group1 = self._find_group(node1)
+        group2 = self._find_group(node2)
+        if group1 == group2:
+            return
+
+        component1 = self._find(self._component, node1)
+        component2 = self._find(self._component, node2)
+        if component1 != component2:
+            # New bridge: hang the smaller tree below the larger one
+            if self._component_size[component1] > self._component_size[component2]:
+                node1, node2 = node2, node1
+                group1, group2 = group2, group1
+                component1, component2 = component2, component1
+            self._make_root(group1)
+            self._up[group1] = (node1, node2)
+            self._component[component1] = component2
+            self._component_size[component2] += self._component_size.pop(component1)
+        else:
+            # The edge closes a cycle: every bridge on the forest path stops being a bridge
+            self._merge_path(group1, group2)
+
+
+    def _make_root(self, group):
+        # Re-orient the bridge tree so that 'group' becomes its root.
+        new_up = None
+        while group is not None:
+            old_up = self._up.pop(group, None)
+            if new_up is not None:
+                self._up[group] = new_up
+            if old_up is None:
+                break
+            inside, outside = old_up
+            new_up = (outside, inside)
+            group = self._find_group(outside)
+
+
+    def _merge_path(self, group1, group2):
+        # Walk both groups up to their lowest common ancestor, then merge the whole path.
+        seen = set()
+        path1, path2 = [], []
+        ancestor = None
+        while ancestor is None:
+            for path, group in ((path1, group1), (path2, group2)):
+                if group is None:
+                    continue
+                path.append(group)
+                if group in seen:
+                    ancestor = group
+                    break
+                seen.add(group)
+                up = self._up.get(group)
+                next_group = self._find_group(up[1]) if up else None
+                if path is path1:
+                    group1 = next_group
+                else:
+                    group2 = next_group
+
+        on_path = path1[:path1.index(ancestor) + 1] + path2[:path2.index(ancestor) + 1]
+        instrumentation.count('connectivity.groups_merged', len(set(on_path)) - 1)
+        ancestor_up = self._up.get(ancestor)
+        target = max(on_path, key=self._size.get)
+        for group in set(on_path):
+            self._up.pop(group, None)
+            if group != target:
+                self._group[group] = target
+                self._size[target] += self._size.pop(group)
+        if ancestor_up is not None:
+            self._up[target] = ancestor_up
+
+
+#-----------------------------Edge removal:
+
+    def _split_group(self, group, node1, node2):
+        # Re-split one 2-edge-connected group after its edge node1-node2 went away.
+        # A new bridge lies on every remaining node1-node2 path, so the group breaks into a
+        # chain of pieces along any one such path. With one unit of flow sent along it, the
+        # residual search from either end reaches exactly the piece at that end (or the
+        # other end, if no bridge separates them). Pieces are peeled off both ends in
+        # lockstep until the two searches meet: the cost follows the pieces cut loose,
+        # never the whole group.
+        path = self._path_within(group, node1, node2)
+        following = dict(zip(path, path[1:]))
+        preceding = dict(zip(path[1:], path))
+        front, back = 0, len(path) - 1
+        front_links, back_links = [], []  # Bridge of each peeled piece toward the remaining group
+        while front != back:
+            side, piece = self._peel(group, path[front], path[back], following, preceding)
+            if piece is None:
+                break
+            self._size[group] -= len(piece)
+            new_group = self._new_group(len(piece))
+            for node in piece:
+                self._group[node] = new_group
+            if side == 0:
+                while path[front] in piece:  # The path leaves a piece once, over its bridge
+                    front += 1
+                front_links.append((new_group, path[front - 1], path[front]))
+            else:
+                while path[back] in piece:
+                    back -= 1
+                back_links.append((new_group, path[back + 1], path[back]))
+        if not front_links and not back_links:
+            instrumentation.count('connectivity.splits_avoided')
+            return
+        instrumentation.count('connectivity.group_splits')
+
+        # The pieces form a path of bridges; orient it toward the old parent link
+        chain = [piece for piece, _, _ in front_links] + [group]
+        links = [(inside, outside) for _, inside, outside in front_links]
+        for piece, inside, outside in reversed(back_links):
+            chain.append(piece)
+            links.append((outside, inside))
+        old_up = self._up.pop(group, None)
+        top = chain.index(self._find_group(old_up[0])) if old_up else len(front_links)
+        if old_up:
+            self._up[chain[top]] = old_up
+        for i, piece in enumerate(chain):
+            if i < top:
+                self._up[piece] = links[i]
+            elif i > top:
+                self._up[piece] = links[i - 1][::-1]
+
+
+    def _path_within(self, group, source, target):
+        # A shortest source-target path inside 'group' (bidirectional BFS; one must exist,
+        # since a group stays connected when one of its edges goes away).
+        adjacency = self.graph.graph
+        parents = ({source: None}, {target: None})
+        queues = (deque([source]), deque([target]))
+        scanned = 0
+        while True:
+            for side in (0, 1):
+                u = queues[side].popleft()
+                scanned += 1
+                for v in adjacency[u]:
+                    if v in parents[side] or self._find(self._group, v) != group:
+                        continue
+                    parents[side][v] = u
+                    if v in parents[1 - side]:
+                        instrumentation.count('connectivity.split_nodes_scanned', scanned)
+                        path = []
+                        while v is not None:
+                            path.append(v)
+                            v = parents[0][v]
+                        path.reverse()
+                        v = parents[1][path[-1]]
+                        while v is not None:
+                            path.append(v)
+                            v = parents[1][v]
+                        return path
+                    queues[side].append(v)
+
+
+    def _peel(self, group, front, back, following, preceding):
+        # Lockstep residual searches from both ends of the remaining path: the front one may
+        # not walk the path forwards, the back one not backwards. Returns (side, nodes) for the
+        # first search that runs out (the whole end piece), or (None, None) once they meet.
+        adjacency = self.graph.graph
+        seen = ({front}, {back})
+        queues = (deque([front]), deque([back]))
+        blocked = (following, preceding)
+        try:
+            while True:
+                for side in (0, 1):
+                    if not queues[side]:
+                        return side, seen[side]
+                    u = queues[side].popleft()
+                    ahead = blocked[side].get(u)
+                    for v in adjacency[u]:
+                        if v == ahead or v in seen[side] or self._find(self._group, v) != group:
+                            continue
+                        if v in seen[1 - side]:
+                            return None, None
+                        seen[side].add(v)
+                        queues[side].append(v)
+        finally:
+            instrumentation.count('connectivity.split_nodes_scanned', len(seen[0]) + len(seen[1]))
+
+
+    def _cut_bridge(self, node1, node2, group1, group2):
+        # A bridge was removed: detach the child subtree and relabel both halves.
+        if self._up.get(group1) == (node1, node2):
+            del self._up[group1]
+        else:
+            del self._up[group2]
+
+        old_component = self._find(self._component, node1)
+        instrumentation.count('connectivity.component_relabels')
+        instrumentation.count('connectivity.relabel_nodes_scanned', self._component_size[old_component])
+        del self._component_size[old_component]
+        adjacency = self.graph.graph
+        for root in (node1, node2):
+            nodes = [root]
+            seen = {root}
+            queue = deque([root])
+            while queue:
+                u = queue.popleft()
+                for v in adjacency[u]:
+                    if v not in seen:
+                        seen.add(v)
+                        nodes.append(v)
+                        queue.append(v)
+            for node in nodes:
+                self._component[node] = root
+            self._component_size[root] = len(nodes)
@@ -0,0 +1,171 @@
+import copy
+from collections.abc import MutableMapping
+
+from graph import Graph
+
+
+class CowGraph(Graph):
+    # Copy-on-write view of a shared, read-only base Graph.
+    # Reads fall through to the base; the first mutation touching a node copies just
+    # that node's neighbor list into the overlay, and removed base edges are kept as
+    # weight tombstones. Many CowGraphs (e.g. one per game session) can share one base
+    # maze while each only pays for the edges it changed. The base must not be mutated
+    # while overlays on it are in use, so it is made read-only
+    # (see Graph.make_read_only).
+
+    def __init__(self, base, verbose=False, cache_size=128):
+        super().__init__(directed=base.directed, verbose=verbose, cache_size=cache_size)
+        base.make_read_only()
+        self.base = base
+        self.graph = _OverlayAdjacency(base.graph)
+        self.weights = CowDict(base.weights)
+        self._adjacency_entries = base._adjacency_entries
+
+
+    def _adjacency_list(self, node):
+        self._check_mutable()
+        return self.graph.writable(node)
+
+
+    def delta_size(self):
+        # (private neighbor lists, added/overridden weights, weight tombstones).
+        return len(self.graph.own), len(self.weights.own), len(self.weights.removed)
+
+
+class _OverlayAdjacency(MutableMapping):
+    # node -> neighbor list: the private copy if the node was written, else the base list.
+
+    def __init__(self, base):
+        self.base = base
+        self.own = {}
+        self._new_nodes = 0  # Nodes in 'own' that the base does not have
+
+    def __getitem__(self, node):
+        neighbors = self.own.get(node)
+        if neighbors is not None:
+            return neighbors
+        neighbors = self.base.get(node)
+        if neighbors is not None:
+            return neighbors
+        return self.writable(node)  # Missing node: behave like the base defaultdict
+
+    def get(self, node, default=None):
+        neighbors = self.own.get(node)
+        if neighbors is not None:
+            return neighbors
+        return self.base.get(node, default)
+
+    def writable(self, node):
+        # Private (copied on first call) neighbor list of 'node', safe to mutate.
+        neighbors = self.own.get(node)
+        if neighbors is None:
+            shared = self.base.get(node)
+            if shared is None:
+                self._new_nodes += 1
+                neighbors = []
+            else:
+                neighbors = list(shared)
+            self.own[node] = neighbors
+        return neighbors
+
+    def __setitem__(self, node, neighbors):
+        if node not in self.own and node not in self.base:
+            self._new_nodes += 1
+        self.own[node] = neighbors
+
+    def __delitem__(self, node):
+        raise TypeError("Nodes cannot be removed from a Graph")
+
+    def __contains__(self, node):
+        return node in self.own or node in self.base
+
+    def __iter__(self):
+        yield from self.base
+        for node in self.own:
+            if node not in self.base:
+                yield node
+
+    def __len__(self):
+        return len(self.base) + self._new_nodes
+
+
+class CowDict(MutableMapping):
+    # Copy-on-write dict over a shared, read-only base mapping: overlay entries first,
+    # then base entries not tombstoned. Holds CowGraph's weights and the state of
+    # indexes copied onto a CowGraph (see e.g. DynamicConnectivity.copy). Mutable values
+    # (sets, lists) may be shared with the base, so change them in place only through
+    # setdefault(), which hands out a private copy on first use; on a plain dict the
+    # same call is just setdefault(). Setting a key back to its base value drops the
+    # overlay entry, so repairs that recompute unchanged values cost no memory.
+
+    def __init__(self, base):
+        self.base = base
+        self.own = {}
+        self.removed = set()  # Tombstones: base keys deleted in this overlay
+        self._length = len(base)
+
+    def __getitem__(self, key):
+        value = self.own.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self.removed:
+            raise KeyError(key)
+        return self.base[key]
+
+    def get(self, key, default=None):
+        value = self.own.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self.removed:
+            return default
+        return self.base.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.own or (key not in self.removed and key in self.base)
+
+    def __setitem__(self, key, value):
+        own = self.own
+        if key in self.removed:
+            self.removed.discard(key)
+            self._length += 1
+        elif key not in own and key not in self.base:
+            self._length += 1
+        if self.base.get(key, _MISSING) == value:
+            own.pop(key, None)  # Back to the base value
+        else:
+            own[key] = value
+
+    def setdefault(self, key, default=None):
+        value = self.own.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self.removed:
+            self.removed.discard(key)
+        else:
+            value = self.base.get(key, _MISSING)
+            if value is not _MISSING:
+                value = self.own[key] = copy.copy(value)  # Private copy of a shared value
+                return value
+        self._length += 1
+        self.own[key] = default  # Stored even if equal to the base value: the caller may mutate it
+        return default
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.own.pop(key, None)
+        if key in self.base:
+            self.removed.add(key)
+        self._length -= 1
+
+    def __iter__(self):
+        for key in self.base:
+            if key not in self.removed and key not in self.own:
+                yield key
+        yield from self.own
+
+    def __len__(self):
+        return self._length
+
+
+_MISSING = object()  # Sentinel for lookups where None is a valid value
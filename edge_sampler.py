@@ -0,0 +1,95 @@
+import itertools
+
+from cow_graph import CowDict
+
+
+class EdgeSampler:
+    # Uniform random edges and non-edges of a Graph, kept in sync through Graph.subscribe().
+    # Edges live in a position -> edge dict plus its inverse; a removal moves the last edge
+    # into the freed slot (swap-remove), so add, remove and sample are all O(1). Dicts
+    # rather than lists, so that copies can share them (see copy()).
+    # Undirected edges are stored once, in the orientation they were added.
+    # Non-edges are found by rejection: a uniform node pair is accepted if it is not an
+    # edge, which takes 1 / (1 - density) tries on average (about 1 on sparse mazes).
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._edges = {}  # position -> edge, positions 0 .. len - 1
+        self._position = {}  # edge -> position
+        self._nodes = {}  # position -> node for pair sampling, extended as the graph grows
+        for edge in graph.weights:
+            if graph.directed or (edge[1], edge[0]) not in self._position:
+                self._position[edge] = len(self._edges)
+                self._edges[len(self._edges)] = edge
+        graph.subscribe(self)
+
+
+    def copy(self, graph):
+        # Sampler for 'graph', an unchanged copy (e.g. a CowGraph) of this sampler's graph.
+        # The copy shares this sampler's tables through CowDicts, so this sampler must not
+        # change afterwards; the node table is filled first so copies do not each fill it.
+        self._add_new_nodes()
+        clone = EdgeSampler.__new__(EdgeSampler)
+        clone.graph = graph
+        clone._edges = CowDict(self._edges)
+        clone._position = CowDict(self._position)
+        clone._nodes = CowDict(self._nodes)
+        graph.subscribe(clone)
+        return clone
+
+
+    def detach(self):
+        self.graph.unsubscribe(self)
+
+
+    def __len__(self):
+        return len(self._edges)
+
+
+#-----------------------------Sampling:
+
+    def sample_edge(self, rng):
+        # A uniformly random existing edge (node1, node2), or None if there are none.
+        if not self._edges:
+            return None
+        return self._edges[rng.randrange(len(self._edges))]
+
+
+    def sample_non_edge(self, rng, tries=32):
+        # A uniformly random pair of distinct, non-adjacent nodes, or None after 'tries' rejections.
+        self._add_new_nodes()
+        nodes = self._nodes
+        if len(nodes) < 2:
+            return None
+        weights = self.graph.weights
+        for _ in range(tries):
+            node1 = nodes[rng.randrange(len(nodes))]
+            node2 = nodes[rng.randrange(len(nodes))]
+            if node1 != node2 and (node1, node2) not in weights:
+                return node1, node2
+        return None
+
+
+    def _add_new_nodes(self):
+        nodes = self._nodes
+        if len(nodes) != len(self.graph.graph):
+            for node in itertools.islice(self.graph.graph, len(nodes), None):  # New nodes come last
+                nodes[len(nodes)] = node
+
+
+#-----------------------------Graph listener hooks:
+
+    def on_edge_added(self, node1, node2, weight):
+        self._position[(node1, node2)] = len(self._edges)
+        self._edges[len(self._edges)] = (node1, node2)
+
+
+    def on_edge_removed(self, node1, node2):
+        edge = (node1, node2)
+        if edge not in self._position:
+            edge = (node2, node1)  # Undirected edge stored in the other orientation
+        index = self._position.pop(edge)
+        last = self._edges.pop(len(self._edges) - 1)
+        if index < len(self._edges):
+            self._edges[index] = last
+            self._position[last] = index
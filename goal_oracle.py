@@ -0,0 +1,98 @@
+import heapq
+import itertools
+
+from incremental_paths import IncrementalShortestPaths
+
+
+class GoalOracle:
+    # Reachability, weighted distance and hop distance to one goal node of an undirected
+    # Graph, for every node in O(1). Both are goal-rooted IncrementalShortestPaths trees,
+    # so they are repaired on each add_edge/remove_edge instead of being recomputed; the
+    # hop tree is only built the first time a hop distance is asked for.
+    # Candidates come ranked (closest to the goal first) without scanning the graph:
+    # moves only look at the neighbors, and teleport targets are read off the weighted
+    # tree outward from the goal, in distance order, skipping neighbors of the player
+    # by a hashed (node1, node2) lookup in graph.weights.
+
+    def __init__(self, graph, goal):
+        if graph.directed:
+            raise ValueError("GoalOracle needs an undirected graph")
+        self.graph = graph
+        self.goal = goal
+        self.paths = IncrementalShortestPaths(graph, goal)  # Weighted distances and next hops
+        self._hops = None  # Unit-weight tree, built on first use
+
+
+    def copy(self, graph):
+        # Oracle for 'graph', an unchanged copy (e.g. a CowGraph) of this oracle's graph.
+        clone = GoalOracle.__new__(GoalOracle)
+        clone.graph = graph
+        clone.goal = self.goal
+        clone.paths = self.paths.copy(graph)
+        clone._hops = self._hops.copy(graph) if self._hops is not None else None
+        return clone
+
+
+    def detach(self):
+        # Stop following graph changes.
+        self.paths.detach()
+        if self._hops is not None:
+            self._hops.detach()
+
+
+#-----------------------------Per-node queries:
+
+    def reachable(self, node):
+        # True if 'node' is connected to the goal.
+        return node in self.paths.distances
+
+
+    def distance(self, node):
+        # Weighted shortest distance to the goal (inf if unreachable).
+        return self.paths.distance(node)
+
+
+    def hop_distance(self, node):
+        # Fewest edges to the goal (inf if unreachable).
+        if self._hops is None:
+            self._hops = IncrementalShortestPaths(self.graph, self.goal, unit_weights=True)
+        return self._hops.distance(node)
+
+
+    def next_hop(self, node):
+        # Neighbor of 'node' on a shortest path to the goal (None at the goal or if unreachable).
+        return self.paths.parents.get(node)
+
+
+#-----------------------------Ranked candidates:
+
+    def move_candidates(self, position):
+        # Neighbors of 'position', best first: by edge weight plus the neighbor's distance
+        # to the goal, then by hop distance. O(deg log deg).
+        weights = self.graph.weights
+        return sorted(self.graph.graph.get(position, ()),
+                      key=lambda node: (weights[(position, node)] + self.distance(node), self.hop_distance(node)))
+
+
+    def iter_teleport_candidates(self, position):
+        # Valid teleport targets (not 'position', not the goal, not adjacent to 'position')
+        # that can reach the goal, in nondecreasing distance to it. Walks the shortest-path
+        # tree from the goal with a heap keyed by distance: a child is never closer than
+        # its parent, so stopping after k targets costs O((k + deg(position)) log V).
+        children = self.paths.children
+        distances = self.paths.distances
+        weights = self.graph.weights
+        counter = itertools.count()  # Heap tie-breaker so nodes are never compared
+        heap = [(distances[child], next(counter), child) for child in children.get(self.goal, ())]
+        heapq.heapify(heap)
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            for child in children.get(node, ()):
+                heapq.heappush(heap, (distances[child], next(counter), child))
+            if node != position and (position, node) not in weights:
+                yield node
+
+
+    def teleport_candidates(self, position, limit=None):
+        # The first 'limit' (default: all) targets of iter_teleport_candidates().
+        return list(itertools.islice(self.iter_teleport_candidates(position), limit))
@@ -1,21 +1,54 @@
+import contextlib
+import heapq
 from collections import defaultdict, deque
 
+import coloring
+import instrumentation
+import parallel_paths
+import traversal
+from compact_graph import CompactGraph
+from query_cache import QueryCache
+
 class Graph:
     # Graph class for creation, editing, and analysis.
 
-    def __init__(self, directed=False):
+    def __init__(self, directed=False, verbose=True, cache_size=128):
         # Initialize the graph (directed or undirected).
+        # verbose=False silences the per-operation messages (useful for large graphs).
+        # cache_size bounds the LRU cache of query results (0 disables it).
         self.graph = defaultdict(list)
-        self.weights = {}  # Store edge weights
+        self.weights = {}  # Store edge weights (also the O(1) edge-existence index)
         self.directed = directed
+        self.verbose = verbose
+        self.listeners = []  # Objects notified of edge changes (see subscribe)
+        self.version = 0  # Bumped by every mutation; stamps cached query results
+        self.cache = QueryCache(cache_size)
+        self._adjacency_entries = 0  # Total length of all adjacency lists, kept for graph_density
+        self.read_only = False  # Set by make_read_only(): every mutation raises
+
+
+    def make_read_only(self):
+        # Refuse every mutation from now on. CowGraph calls this on its base: overlays, and
+        # indexes copied onto them, read the base's state and would silently break if it changed.
+        self.read_only = True
+
+
+    def _check_mutable(self):
+        if self.read_only:
+            raise TypeError("Graph is read-only (e.g. the shared base of a CowGraph)")
 
-        # Variables used for Tarjan's algorithm
-        self.index = 0  # To track of the discovery time of each node
-        self.stack = []  # Stack to keep nodes being explored
-        self.on_stack = set()  # Set to track nodes currently in the stack
-        self.sccs = []  # List to store SCC
-        self.indices = {}  # Stores the discovery time (index) of each node
-        self.low_link = {}  # Stores the low-link values of nodes
+
+    def _adjacency_list(self, node):
+        # The neighbor list mutations may change in place (created on first use);
+        # CowGraph overrides it to copy a shared list first. Every edge mutation starts
+        # here, so this is also where a read-only graph refuses them.
+        self._check_mutable()
+        return self.graph[node]
+
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
 
 
 #-----------------------------Other functions on graphs to define:
@@ -23,30 +56,118 @@ class Graph:
     def add_node(self, node):
         #Add a node to the graph.
         if node not in self.graph:
+            self._check_mutable()
             self.graph[node] = []
-            print(f"Node '{node}' added.")
+            self.version += 1
+            self._log(f"Node '{node}' added.")
+            self._node_added(node)
         else:
-            print(f"Node '{node}' already exists.")
+            self._log(f"Node '{node}' already exists.")
 
 
     def add_edge(self, node1, node2, weight=1):
-        if node2 not in self.graph[node1]:  # Prevent duplicate edges
-            self.graph[node1].append(node2)
+        # Counted but not timed: even disabled, the @timed wrapper adds ~17% to this hot path.
+        if (node1, node2) not in self.weights:  # Prevent duplicate edges
+            self._adjacency_list(node1).append(node2)
             self.weights[(node1, node2)] = weight
-            if not self.directed:
-                self.graph[node2].append(node1)
+            self._adjacency_entries += 1
+            if not self.directed and node1 != node2:
+                self._adjacency_list(node2).append(node1)
                 self.weights[(node2, node1)] = weight
-            print(f"Edge added: {node1} --- {node2} (weight={weight})")
+                self._adjacency_entries += 1
+            self.version += 1
+            self._log(f"Edge added: {node1} --- {node2} (weight={weight})")
+            instrumentation.count('graph.edges_added')
+            for listener in self.listeners:
+                listener.on_edge_added(node1, node2, weight)
 
 
     def remove_edge(self, node1, node2):
-        if node2 in self.graph[node1]:  # Only proceed if the edge exists
-            self.graph[node1].remove(node2)
+        if (node1, node2) in self.weights:  # Only proceed if the edge exists
+            self._adjacency_list(node1).remove(node2)
             del self.weights[(node1, node2)]
-            if not self.directed:
-                self.graph[node2].remove(node1)
+            self._adjacency_entries -= 1
+            if not self.directed and node1 != node2:
+                self._adjacency_list(node2).remove(node1)
                 del self.weights[(node2, node1)]
-            print(f"Edge removed: {node1} --- {node2}")
+                self._adjacency_entries -= 1
+            self.version += 1
+            self._log(f"Edge removed: {node1} --- {node2}")
+            instrumentation.count('graph.edges_removed')
+            for listener in self.listeners:
+                listener.on_edge_removed(node1, node2)
+
+
+#-----------------------------Bulk ingestion:
+
+    def add_nodes_from(self, nodes):
+        # Add many nodes at once; existing nodes are skipped. Returns the number added.
+        self._check_mutable()
+        graph = self.graph
+        notify = any(hasattr(listener, 'on_node_added') for listener in self.listeners)
+        added = 0
+        for node in nodes:
+            if node not in graph:
+                graph[node] = []
+                added += 1
+                if notify:
+                    self._node_added(node)
+        if added:
+            self.version += 1
+        self._log(f"{added} nodes added.")
+        return added
+
+
+    @instrumentation.timed
+    def add_edges_from(self, edges):
+        # Add many (node1, node2) or (node1, node2, weight) edges in one pass.
+        # Duplicates (already in the graph or repeated in 'edges') are skipped. Returns the number added.
+        adjacency_list = self._adjacency_list
+        weights = self.weights
+        directed = self.directed
+        listeners = self.listeners
+        added = skipped = 0
+        for edge in edges:
+            if len(edge) == 3:
+                node1, node2, weight = edge
+            else:
+                node1, node2 = edge
+                weight = 1
+            if (node1, node2) in weights:
+                skipped += 1
+                continue
+            adjacency_list(node1).append(node2)
+            weights[(node1, node2)] = weight
+            self._adjacency_entries += 1
+            if not directed and node1 != node2:
+                adjacency_list(node2).append(node1)
+                weights[(node2, node1)] = weight
+                self._adjacency_entries += 1
+            added += 1
+            self.version += 1  # Per edge, so listeners called mid-batch see current counters
+            for listener in listeners:
+                listener.on_edge_added(node1, node2, weight)
+        instrumentation.count('graph.edges_added', added)
+        self._log(f"{added} edges added ({skipped} duplicates skipped).")
+        return added
+
+
+    def subscribe(self, listener):
+        # Register an index that must stay in sync with the graph.
+        # 'listener' needs on_edge_added(node1, node2, weight) and on_edge_removed(node1, node2);
+        # it may also define on_node_added(node), called for nodes added without an edge.
+        self.listeners.append(listener)
+
+
+    def _node_added(self, node):
+        for listener in self.listeners:
+            on_node_added = getattr(listener, 'on_node_added', None)
+            if on_node_added is not None:
+                on_node_added(node)
+
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
 
 
     def save_graph(self, filename):
@@ -56,16 +177,36 @@ class Graph:
                 for neighbor in neighbors:
                     weight = self.weights.get((node, neighbor), 1)
                     file.write(f"{node} {neighbor} {weight}\n")
-        print(f"Graph saved to {filename}")
+        self._log(f"Graph saved to {filename}")
 
 
     def load_graph(self, filename):
-        # Load a graph from a file.
+        # Load a graph from a file (streamed through the bulk edge path).
         with open(filename, 'r') as file:
-            for line in file:
-                node1, node2, weight = line.strip().split()
-                self.add_edge(node1, node2, int(weight))
-        print(f"Graph loaded from {filename}")
+            edges = ((node1, node2, int(weight)) for node1, node2, weight in (line.split() for line in file))
+            self.add_edges_from(edges)
+        self._log(f"Graph loaded from {filename}")
+
+
+    def save_binary(self, filename):
+        # Save the graph in the compact binary format (header, CSR arrays, label table).
+        self.freeze().save(filename)
+        self._log(f"Graph saved to {filename}")
+
+
+    def load_binary(self, filename):
+        # Load edges from a binary graph file into this graph.
+        # For read-only use, CompactGraph.open(filename) maps the file without copying it.
+        compact = CompactGraph.open(filename)
+        try:
+            self.add_nodes_from(compact.labels)
+            self.add_edges_from(compact.edges())
+        except BaseException:
+            with contextlib.suppress(BufferError):  # Keep the original error, not a failed close
+                compact.close()
+            raise
+        compact.close()
+        self._log(f"Graph loaded from {filename}")
 
 
     def display_graph(self):
@@ -75,19 +216,25 @@ class Graph:
             print(f"{node}: {neighbors}")
 
 
+    def freeze(self):
+        # Return a read-only CompactGraph (CSR arrays) snapshot of the current graph.
+        return CompactGraph.from_graph(self)
+
+
 #-----------------------------Basic graph metric:
 
     def node_degree(self, node):
-        #Return the degree of a given node.
-        if node in self.graph:
-            return len(self.graph[node])
+        #Return the degree of a given node (O(1): the adjacency list length).
+        neighbors = self.graph.get(node)
+        if neighbors is not None:
+            return len(neighbors)
         else:
             return 0  # Node does not exist
 
 
     def graph_density(self):
-        #Calculate the density of the graph."""
-        num_edges = sum(len(neighbors) for neighbors in self.graph.values()) // 2  # For undirected graph
+        #Calculate the density of the graph (O(1) from the maintained adjacency-entry count).
+        num_edges = self._adjacency_entries // 2  # For undirected graph
         num_nodes = len(self.graph)
         if num_nodes > 1:
             max_edges = num_nodes * (num_nodes - 1) / 2
@@ -98,165 +245,344 @@ class Graph:
 
 #-----------------------------Path finding algo:
 
+    @instrumentation.timed
     def find_shortest_path(self, start, end):
-        # Find the shortest path between two nodes (Dijkstra's algorithm).
-        distances = {node: float('inf') for node in self.graph}
-        distances[start] = 0
-        previous_nodes = {node: None for node in self.graph}
-        unvisited = set(self.graph)
-
-        while unvisited:
-            current = min(unvisited, key=lambda node: distances[node])
-            unvisited.remove(current)
-
+        # Find the shortest path between two nodes (Dijkstra's algorithm on a binary heap).
+        # Unreachable targets keep the old contract: ([end], inf). Results are cached per graph version.
+        path, distance = self._cached('find_shortest_path', self._point_to_point, start, end)
+        return list(path), distance
+
+
+    def _point_to_point(self, start, end):
+        distances, previous_nodes = self._dijkstra([start], targets=[end])
+        return self._reconstruct_path(previous_nodes, end), distances.get(end, float('inf'))
+
+
+    @instrumentation.timed
+    def astar_path(self, start, end, heuristic=None):
+        # Goal-directed shortest path (A*), same contract as find_shortest_path.
+        # heuristic(node, end) must never overestimate the remaining distance (see
+        # heuristics.py); nodes are expanded in order of distance + estimate, so a good
+        # bound settles only a corridor toward 'end'. None falls back to Dijkstra.
+        if heuristic is None:
+            return self.find_shortest_path(start, end)
+        distances = {start: 0}
+        previous_nodes = {start: None}
+        heap = [(heuristic(start, end), 0, 0, start)]
+        counter = 1  # Tie-breaker so nodes themselves are never compared
+        expanded = 0
+
+        while heap:
+            _, _, dist, current = heapq.heappop(heap)
+            if dist > distances[current]:
+                continue  # Stale heap entry
             if current == end:
                 break
-
-            for neighbor in self.graph[current]:
-                weight = self.weights[(current, neighbor)]
-                alternative_route = distances[current] + weight
-                if alternative_route < distances[neighbor]:
+            expanded += 1
+            for neighbor in self.graph.get(current, ()):
+                alternative_route = dist + self.weights[(current, neighbor)]
+                if alternative_route < distances.get(neighbor, float('inf')):
+                    estimate = heuristic(neighbor, end)
+                    if estimate == float('inf'):
+                        continue  # The heuristic proves 'end' is unreachable from here
+                    distances[neighbor] = alternative_route
+                    previous_nodes[neighbor] = current
+                    heapq.heappush(heap, (alternative_route + estimate, counter, alternative_route, neighbor))
+                    counter += 1
+
+        instrumentation.count('astar.nodes_expanded', expanded)
+        instrumentation.count('astar.heap_pushes', counter)
+        if end not in distances:
+            return [end], float('inf')
+        return self._reconstruct_path(previous_nodes, end), distances[end]
+
+
+    def shortest_paths_from(self, start, targets=None):
+        # One-to-many: a single Dijkstra run from 'start' answers every target.
+        # Returns {target: (path, distance)}; stops as soon as all targets are settled.
+        if targets is None:
+            targets = list(self.graph)
+        distances, previous_nodes = self._dijkstra([start], targets=targets)
+        return {target: (self._reconstruct_path(previous_nodes, target), distances.get(target, float('inf')))
+                for target in targets}
+
+
+    def shortest_path_table(self, sources, targets):
+        # Many-to-many: one search per source, each shared across all targets.
+        # Returns {source: {target: (path, distance)}}.
+        targets = list(targets)
+        return {source: self.shortest_paths_from(source, targets) for source in sources}
+
+
+    def distance_matrix(self, sources=None, workers=None, output=None):
+        # All-pairs (or many-source) distances computed by a process pool over a shared-memory
+        # CSR copy; returns a parallel_paths.DistanceMatrix (close() it when done).
+        return parallel_paths.distance_matrix(self, sources, workers, output)
+
+
+    @instrumentation.timed
+    def multi_source_shortest_path(self, sources, end):
+        # Shortest path from whichever of 'sources' is closest to 'end' (one search, all sources seeded at 0).
+        distances, previous_nodes = self._dijkstra(sources, targets=[end])
+        return self._reconstruct_path(previous_nodes, end), distances.get(end, float('inf'))
+
+
+    @instrumentation.timed
+    def shortest_path_lengths(self, sources, targets=None):
+        # Distances from the nearest of 'sources' to every reached node (or just until 'targets' are settled).
+        distances, _ = self._dijkstra(sources, targets=targets)
+        return distances
+
+
+    def _dijkstra(self, sources, targets=None):
+        # Heap-based Dijkstra core shared by the path queries above.
+        # Returns (distances, previous_nodes) for every settled/reached node.
+        distances = {}
+        previous_nodes = {}
+        heap = []
+        counter = 0  # Tie-breaker so nodes themselves are never compared
+        for source in sources:
+            if source not in distances:
+                distances[source] = 0
+                previous_nodes[source] = None
+                heap.append((0, counter, source))
+                counter += 1
+        heapq.heapify(heap)
+        seeded = counter
+
+        remaining = set(targets) if targets is not None else None
+        settled = set()
+
+        while heap:
+            dist, _, current = heapq.heappop(heap)
+            if current in settled:
+                continue  # Stale heap entry
+            settled.add(current)
+
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    break  # Every requested target is final
+
+            for neighbor in self.graph.get(current, ()):
+                alternative_route = dist + self.weights[(current, neighbor)]
+                if alternative_route < distances.get(neighbor, float('inf')):
                     distances[neighbor] = alternative_route
                     previous_nodes[neighbor] = current
+                    heapq.heappush(heap, (alternative_route, counter, neighbor))
+                    counter += 1
 
-        # Reconstruct path
+        if instrumentation.enabled():  # Derived after the loop so the disabled path pays nothing
+            instrumentation.count('dijkstra.nodes_expanded', len(settled))
+            instrumentation.count('dijkstra.edges_scanned', sum(len(self.graph.get(node, ())) for node in settled))
+            instrumentation.count('dijkstra.edges_relaxed', counter - seeded)
+            instrumentation.count('dijkstra.heap_pushes', counter)
+        return distances, previous_nodes
+
+
+    def _reconstruct_path(self, previous_nodes, end):
+        # Walk the predecessor chain back from 'end', then reverse once.
+        if end not in previous_nodes:
+            return [end]
         path, current = [], end
-        while current:
-            path.insert(0, current)
+        while current is not None:
+            path.append(current)
             current = previous_nodes[current]
-        return path, distances[end]
+        path.reverse()
+        return path
 
 
+    @instrumentation.timed
     def all_paths(self, start, end, path=None):
         # Find all paths from 'start' point to 'end' point.
-        if path is None:
-            path = [start]
+        # 'path' is an optional prefix that already ends at 'start'.
+        return list(self.iter_paths(start, end, path=path))
+
+
+    def iter_paths(self, start, end, max_paths=None, max_length=None, max_weight=None, path=None):
+        # Lazily yield simple paths from 'start' to 'end' (same order as all_paths).
+        # Optional cutoffs: stop after 'max_paths' paths, prune paths with more than
+        # 'max_length' edges or a total weight above 'max_weight'.
+        found = 0
+        for route, _ in self._walk_paths(start, end, max_length, max_weight, path):
+            yield list(route)
+            found += 1
+            if max_paths is not None and found >= max_paths:
+                return
+
+
+    @instrumentation.timed
+    def count_paths(self, start, end, max_paths=None, max_length=None, max_weight=None):
+        # Count simple paths from 'start' to 'end' without materializing them.
+        found = 0
+        for _ in self._walk_paths(start, end, max_length, max_weight):
+            found += 1
+            if max_paths is not None and found >= max_paths:
+                break
+        return found
+
+
+    def _walk_paths(self, start, end, max_length=None, max_weight=None, prefix=None):
+        # Iterative DFS over simple paths. Yields (path, weight) where 'path' is the live
+        # working list: callers must copy it before the generator resumes.
+        path = list(prefix) if prefix else [start]
+        on_path = set(path)  # O(1) membership instead of scanning 'path'
         if start == end:
-            return [path]
-        paths = []
-        for neighbor in self.graph[start]:
-            if neighbor not in path:
-                new_paths = self.all_paths(neighbor, end, path + [neighbor])
-                paths.extend(new_paths)
-        return paths
+            yield path, 0
+            return
+
+        weights = self.weights
+        weight = 0
+        path_weights = [0]  # Cumulative weight of the walked part of 'path'
+        neighbor_iters = [iter(self.graph.get(start, ()))]
+
+        while neighbor_iters:
+            current = path[-1]
+            for neighbor in neighbor_iters[-1]:
+                if neighbor in on_path:
+                    continue
+                new_weight = weight + weights[(current, neighbor)]
+                if max_weight is not None and new_weight > max_weight:
+                    continue
+                if max_length is not None and len(path) > max_length:
+                    continue  # Stepping to 'neighbor' would exceed the edge limit
+                if neighbor == end:
+                    path.append(neighbor)
+                    yield path, new_weight
+                    path.pop()
+                    continue
+                if max_length is not None and len(path) == max_length:
+                    continue  # 'neighbor' would use the last allowed edge without reaching the end
+                path.append(neighbor)
+                on_path.add(neighbor)
+                path_weights.append(new_weight)
+                weight = new_weight
+                neighbor_iters.append(iter(self.graph.get(neighbor, ())))
+                break
+            else:
+                # Neighbors exhausted: backtrack
+                neighbor_iters.pop()
+                if len(neighbor_iters) > 0:
+                    on_path.discard(path.pop())
+                    path_weights.pop()
+                    weight = path_weights[-1]
 
 
 # -----------------------------Graph traversal algo:
 
+    @instrumentation.timed
     def bfs(self, start, end):
-        visited = []  # To track visited nodes
+        # Visitation order of a BFS from 'start', stopping at 'end' ([] if never reached).
+        # Use bfs_path() for the actual start -> end path.
+        visited = {start}  # Marked when queued, so each node enters the queue once
         queue = deque([start])  # Queue to explore nodes in BFS
         path = []
 
         while queue:
             node = queue.popleft()  # Take the first node from the queue
-            if node not in visited:
-                visited.append(node)
-                path.append(node)
+            path.append(node)
 
-                if node == end:  # If we reached the end node, return the path
-                    return path
+            if node == end:  # If we reached the end node, return the path
+                instrumentation.count('bfs.nodes_expanded', len(path))
+                return path
 
-                # Add unvisited neighbors to the queue
-                for neighbor in self.graph[node]:
-                    if neighbor not in visited:
-                        queue.append(neighbor)
+            # Add unvisited neighbors to the queue
+            for neighbor in self._neighbors(node):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
 
+        instrumentation.count('bfs.nodes_expanded', len(path))
         return []  # Return empty if no path found
 
 
+    @instrumentation.timed
+    def bfs_path(self, start, end, mode='standard'):
+        # Unweighted shortest path from 'start' to 'end' ([] if unreachable).
+        #   'standard'      - queue-based BFS with parent pointers
+        #   'bidirectional' - searches from both ends and stops where they meet
+        #   'frontier'      - level-synchronous expansion on a CompactGraph snapshot
+        #                     (NumPy-vectorized when available; freezes the graph per call,
+        #                     so for repeated queries call freeze().bfs_path() once instead)
+        return list(self._cached('bfs_path', self._bfs_path, start, end, mode))
+
+
+    def _bfs_path(self, start, end, mode):
+        if mode == 'standard':
+            return traversal.bfs_path(self._neighbors, start, end)
+        if mode == 'bidirectional':
+            predecessors = self._neighbors
+            if self.directed:
+                incoming = defaultdict(list)
+                for node1, node2 in self.weights:
+                    incoming[node2].append(node1)
+                predecessors = lambda node: incoming.get(node, ())
+            return traversal.bidirectional_bfs_path(self._neighbors, predecessors, start, end)
+        if mode == 'frontier':
+            return self.freeze().bfs_path(start, end, mode='frontier')
+        raise ValueError(f"Unknown BFS mode: {mode!r}")
+
+
+    @instrumentation.timed
     def dfs(self, start, end, visited=None):
+        # Depth-first path from 'start' to 'end' (explicit stack, no recursion limit).
         if visited is None:
             visited = set()
+        path = traversal.dfs_path(self._neighbors, start, end, visited)
+        instrumentation.count('dfs.nodes_visited', len(visited))
+        return path
 
-        visited.add(start)
-
-        if start == end:
-            return [start]
-
-        for neighbor in self.graph[start]:
-            if neighbor not in visited:
-                path = self.dfs(neighbor, end, visited)
-                if path:
-                    return [start] + path
 
-        return []
+    def _neighbors(self, node):
+        # Adjacency lookup that does not insert missing nodes into the defaultdict.
+        return self.graph.get(node, ())
 
 
     # -----------------------------Proper graph coloring:
 
-    def graph_coloring(self):
+    @instrumentation.timed
+    def graph_coloring(self, strategy='sequential'):
         # Assign colors to nodes such that no two adjacent nodes share the same color.
-        color = {}
-        for node in self.graph:
-            available_colors = {0, 1, 2, 3}  # For simplicity, just 4 colors
-            for neighbor in self.graph[node]:
-                if neighbor in color:
-                    available_colors.discard(color[neighbor])
-            color[node] = min(available_colors)  # Assign the smallest available color
-        return color
+        # The palette is unbounded; see coloring.py for the strategies ('sequential' keeps
+        # the original node order and gives the same colors whenever 4 colors sufficed).
+        # Only existing nodes are looked up, so plain indexing is safe (and faster than _neighbors).
+        return coloring.greedy_color(list(self.graph), self.graph.__getitem__, strategy)
+
+
+    def coloring_report(self, strategy='dsatur'):
+        # {'strategy', 'colors', 'seconds', 'coloring'} for one coloring run.
+        return coloring.report(list(self.graph), self.graph.__getitem__, strategy)
 
 
 # -----------------------------Computation of set of connected components of an undirected graph:
 
+    @instrumentation.timed
     def connected_components(self):
-        # Find connected components using DFS.
-        visited = set()
-        components = []
-
-        # Perform DFS from a node and collect all reachable nodes
-        def dfs_cc(node, visited):
-            # DFS to collect all nodes in the current connected component.
-            visited.add(node)
-            component = [node]
-            for neighbor in self.graph[node]:
-                if neighbor not in visited:
-                    component += dfs_cc(neighbor, visited)  # Recursive call for unvisited neighbors
-            return component
+        # Find connected components using an iterative DFS (each component in preorder).
+        return [list(component) for component in self._cached('connected_components', self._components)]
 
-        # Iterate through all nodes in the graph
-        for node in self.graph:
-            if node not in visited:
-                component = dfs_cc(node, visited)
-                components.append(component)  # Add the component to the list
 
-        return components
+    def _components(self):
+        instrumentation.count('components.recomputed')
+        return traversal.connected_components(list(self.graph), self._neighbors)
 
 
     # -----------------------------Computation of set of SCC of a directed graph:
 
+    @instrumentation.timed
     def tarjan_scc(self):
         # Find strongly connected components using Tarjan's algorithm.
-        for node in self.graph:
-            if node not in self.indices:
-                self._strongconnect(node)
-        return self.sccs
-
-    def _strongconnect(self, node):
-        # Helper function for DFS in Tarjan's Algorithm.
-        # Set the discovery time and low-link value
-        self.indices[node] = self.low_link[node] = self.index
-        self.index += 1
-        self.stack.append(node)
-        self.on_stack.add(node)
-
-        # Explore each neighbor
-        for neighbor in self.graph[node]:
-            if neighbor not in self.indices:  # If the neighbor hasn't been visited
-                self._strongconnect(neighbor)
-                # After the recursive call, we update the low-link value
-                self.low_link[node] = min(self.low_link[node], self.low_link[neighbor])
-            elif neighbor in self.on_stack:  # If the neighbor is in the current stack
-                # Means the neighbor is part of the current SCC
-                self.low_link[node] = min(self.low_link[node], self.indices[neighbor])
-
-        # If node is a root (start point of an SCC)
-        if self.low_link[node] == self.indices[node]:
-            scc = []
-            while True:
-                w = self.stack.pop()
-                self.on_stack.remove(w)
-                scc.append(w)
-                if w == node:
-                    break
-            self.sccs.append(scc)
+        # All state is local to the call, so repeated calls return fresh results.
+        return [list(scc) for scc in self._cached('tarjan_scc', self._sccs)]
+
+
+    def _sccs(self):
+        return traversal.strongly_connected_components(list(self.graph), self._neighbors)
+
+
+#-----------------------------Query cache:
+
+    def _cached(self, query, compute, *args):
+        # compute(*args), memoized in the LRU cache for the current graph version.
+        # Callers copy mutable results so the cached value is never handed out.
+        return self.cache.get_or_compute((query, args), compute, *args, version=self.version)
@@ -0,0 +1,102 @@
+import bisect
+
+from cow_graph import CowGraph
+from graph import Graph
+
+
+class GraphHistory:
+    # Turn-by-turn history of a Graph without copying it every turn, kept in sync
+    # through Graph.subscribe(). Every edge change is appended to a log; mark_turn()
+    # records where each turn ends. A full checkpoint copy is only taken once the
+    # changes since the previous one reach 'checkpoint_every' entries (default: the
+    # graph's edge count at that time), so memory grows with the number of changes,
+    # not with turns x graph size.
+    # graph_at(turn) is a CowGraph over the nearest earlier checkpoint with the log
+    # replayed on top: O(changes since that checkpoint), never O(V + E).
+
+    def __init__(self, graph, checkpoint_every=None):
+        self.graph = graph
+        self.checkpoint_every = checkpoint_every
+        self.log = []  # (node1, node2, weight) for an added edge, (node1, node2, None) for a removed one,
+                       # (node,) for a node added with add_node()/add_nodes_from()
+        self._turn_ends = [0]  # Log length at the end of each turn (turn 0 = when recording began)
+        self._checkpoint_positions = []  # Log positions of the checkpoints (ascending)
+        self._checkpoints = []
+        self._checkpoint()
+        graph.subscribe(self)
+
+
+    def detach(self):
+        # Stop recording graph changes.
+        self.graph.unsubscribe(self)
+
+
+    @property
+    def turn(self):
+        # Number of completed turns.
+        return len(self._turn_ends) - 1
+
+
+    def mark_turn(self):
+        # Close the current turn; its graph becomes graph_at(self.turn).
+        self._turn_ends.append(len(self.log))
+
+
+#-----------------------------Queries:
+
+    def graph_at(self, turn):
+        # Graph as it was at the end of 'turn' (a private CowGraph: safe to modify).
+        if not 0 <= turn <= self.turn:
+            raise ValueError(f"Turn {turn} is not recorded (0..{self.turn})")
+        position = self._turn_ends[turn]
+        index = bisect.bisect_right(self._checkpoint_positions, position) - 1
+        snapshot = CowGraph(self._checkpoints[index], verbose=False, cache_size=0)
+        for entry in self.log[self._checkpoint_positions[index]:position]:
+            if len(entry) == 1:
+                snapshot.add_node(entry[0])
+            elif entry[2] is None:
+                snapshot.remove_edge(entry[0], entry[1])
+            else:
+                snapshot.add_edge(*entry)
+        return snapshot
+
+
+    def changes(self, turn):
+        # Edge changes made during 'turn' (1-based), as log entries.
+        if not 1 <= turn <= self.turn:
+            raise ValueError(f"Turn {turn} is not recorded (1..{self.turn})")
+        return self.log[self._turn_ends[turn - 1]:self._turn_ends[turn]]
+
+
+#-----------------------------Graph listener hooks:
+
+    def on_edge_added(self, node1, node2, weight):
+        self.log.append((node1, node2, weight))
+        self._maybe_checkpoint()
+
+
+    def on_edge_removed(self, node1, node2):
+        self.log.append((node1, node2, None))
+        self._maybe_checkpoint()
+
+
+    def on_node_added(self, node):
+        self.log.append((node,))
+        self._maybe_checkpoint()
+
+
+    def _maybe_checkpoint(self):
+        limit = self.checkpoint_every
+        if limit is None:
+            limit = max(1, len(self.graph.weights))
+        if len(self.log) - self._checkpoint_positions[-1] >= limit:
+            self._checkpoint()
+
+
+    def _checkpoint(self):
+        # Undirected edges appear twice in 'weights'; add_edges_from skips the second copy.
+        checkpoint = Graph(directed=self.graph.directed, verbose=False, cache_size=0)
+        checkpoint.add_nodes_from(self.graph.graph)
+        checkpoint.add_edges_from((node1, node2, weight) for (node1, node2), weight in self.graph.weights.items())
+        self._checkpoint_positions.append(len(self.log))
+        self._checkpoints.append(checkpoint)
@@ -0,0 +1,121 @@
+# Admissible heuristics for Graph.astar_path(start, end, heuristic).
+# A heuristic is any callable (node, goal) -> lower bound on the remaining distance.
+import random
+
+
+def manhattan(coordinates, scale=1):
+    # Grid mazes: 'coordinates' maps node -> (x, y). Admissible as long as every edge costs
+    # at least 'scale' per grid step it spans (a randomly added shortcut edge breaks this).
+    def heuristic(node, goal):
+        x1, y1 = coordinates[node]
+        x2, y2 = coordinates[goal]
+        return scale * (abs(x1 - x2) + abs(y1 - y2))
+    return heuristic
+
+
+class Landmarks:
+    # ALT heuristic for graphs without geometry. Exact distance tables from (and, on
+    # directed graphs, to) a few landmark nodes give, by the triangle inequality,
+    #   d(v, goal) >= max over L of  d(L, goal) - d(L, v)  and  d(v, L) - d(goal, L).
+    # Tables are only rebuilt by refresh() (a few full Dijkstras), never inside a lookup.
+    # Removed edges only lengthen distances, so the old bounds stay admissible and need
+    # no rebuild; an added edge or node can shorten them, so it marks the tables stale
+    # (Graph.subscribe) and lookups return 0 (plain Dijkstra) until the caller decides
+    # a refresh() pays off: check is_stale() e.g. once per turn.
+
+    def __init__(self, graph, count=4, seed=None):
+        self.graph = graph
+        self.count = count
+        self.seed = seed
+        self.landmarks = []
+        self._tables = []  # One (distances from L, distances to L) pair per landmark
+        self.version = None  # graph.version the tables were built for
+        self._stale = True
+        self.refresh()
+        graph.subscribe(self)
+
+
+    def detach(self):
+        # Stop following graph changes.
+        self.graph.unsubscribe(self)
+
+
+    def __call__(self, node, goal):
+        if self._stale:
+            return 0  # Always admissible
+        inf = float('inf')
+        best = 0
+        for from_landmark, to_landmark in self._tables:
+            # inf - inf is nan and never wins the comparison, which is exactly the
+            # "no information" case; a finite minus inf means the goal is unreachable.
+            bound = from_landmark.get(goal, inf) - from_landmark.get(node, inf)
+            if bound > best:
+                best = bound
+            bound = to_landmark.get(node, inf) - to_landmark.get(goal, inf)
+            if bound > best:
+                best = bound
+        return best
+
+
+    def is_stale(self):
+        # True once an edge or node was added since the last refresh().
+        return self._stale
+
+
+    def refresh(self):
+        # (Re)build the distance tables; landmarks are picked once, farthest-first.
+        if len(self.landmarks) < min(self.count, len(self.graph.graph)):
+            self.landmarks = self._select()
+        reverse = self._reversed() if self.graph.directed else None
+        self._tables = []
+        for landmark in self.landmarks:
+            from_landmark = self.graph.shortest_path_lengths([landmark])
+            to_landmark = reverse.shortest_path_lengths([landmark]) if reverse is not None else from_landmark
+            self._tables.append((from_landmark, to_landmark))
+        self.version = self.graph.version
+        self._stale = False
+
+
+
+    def _select(self):
+        # Farthest-point selection: each new landmark is the node farthest from all chosen
+        # ones (nodes the chosen ones cannot reach at all come first).
+        rng = random.Random(self.seed)
+        nodes = list(self.graph.graph)
+        if not nodes:
+            return []
+        chosen = [rng.choice(nodes)]
+        while len(chosen) < min(self.count, len(nodes)):
+            distances = self.graph.shortest_path_lengths(chosen)
+            unreached = [node for node in nodes if node not in distances]
+            if unreached:
+                chosen.append(rng.choice(unreached))
+            else:
+                chosen.append(max(nodes, key=distances.__getitem__))
+                if distances[chosen[-1]] == 0:
+                    chosen.pop()  # Every node is already a landmark
+                    break
+        return chosen
+
+
+    def _reversed(self):
+        # Distances *to* a landmark are distances from it on the reversed graph.
+        from graph import Graph
+        reverse = Graph(directed=True, verbose=False, cache_size=0)
+        reverse.add_nodes_from(self.graph.graph)
+        reverse.add_edges_from((node2, node1, weight) for (node1, node2), weight in self.graph.weights.items())
+        return reverse
+
+
+#-----------------------------Graph listener hooks:
+
+    def on_edge_added(self, node1, node2, weight):
+        self._stale = True
+
+
+    def on_edge_removed(self, node1, node2):
+        pass  # Distances only grow: the tables still give lower bounds
+
+
+    def on_node_added(self, node):
+        self._stale = True  # No table entries for it yet
@@ -0,0 +1,173 @@
+import heapq
+import itertools
+
+import instrumentation
+from cow_graph import CowDict
+
+
+class IncrementalShortestPaths:
+    # Single-source shortest-path tree that repairs itself on add_edge/remove_edge
+    # (Ramalingam-Reps style, non-negative weights), kept in sync through Graph.subscribe().
+    #  - an added edge only propagates the distances it actually decreases,
+    #  - a removed tree edge invalidates the subtree below it; only that subtree is
+    #    re-seeded from its unaffected neighbors and re-settled with a local Dijkstra.
+    # Removing a non-tree edge costs O(1).
+    # unit_weights=True counts every edge as 1, so distances are hop counts (BFS levels).
+    # Child and predecessor sets are only changed in place through setdefault(), so
+    # copies can share them.
+
+    def __init__(self, graph, source, unit_weights=False):
+        self.graph = graph
+        self.source = source
+        self.unit_weights = unit_weights
+        self.distances = {}  # node -> distance from 'source' (missing = unreachable)
+        self.parents = {}  # node -> predecessor in the shortest-path tree
+        self.children = {}  # node -> set of tree children
+        self._incoming = None  # Predecessor index, only needed for directed graphs
+        self._counter = itertools.count()  # Heap tie-breaker so nodes are never compared
+
+        if graph.directed:
+            self._incoming = {}
+            for (node1, node2) in graph.weights:
+                self._incoming.setdefault(node2, set()).add(node1)
+
+        if unit_weights:
+            self.distances = {source: 0}
+            self._settle([(0, next(self._counter), source)])
+        else:
+            distances, previous_nodes = graph._dijkstra([source])
+            self.distances = distances
+            for node, parent in previous_nodes.items():
+                if parent is not None:
+                    self._set_parent(node, parent)
+        graph.subscribe(self)
+
+
+    def copy(self, graph):
+        # Tree for 'graph', an unchanged copy (e.g. a CowGraph) of this tree's graph.
+        # The copy shares this tree's distances and links through CowDicts instead of
+        # re-running Dijkstra, so this tree must not change afterwards.
+        clone = IncrementalShortestPaths.__new__(IncrementalShortestPaths)
+        clone.graph = graph
+        clone.source = self.source
+        clone.unit_weights = self.unit_weights
+        clone.distances = CowDict(self.distances)
+        clone.parents = CowDict(self.parents)
+        clone.children = CowDict(self.children)
+        clone._incoming = None
+        if self._incoming is not None:
+            clone._incoming = CowDict(self._incoming)
+        clone._counter = itertools.count()
+        graph.subscribe(clone)
+        return clone
+
+
+    def detach(self):
+        # Stop following graph changes.
+        self.graph.unsubscribe(self)
+
+
+#-----------------------------Queries:
+
+    def distance(self, node):
+        # Current shortest distance from the source (inf if unreachable).
+        return self.distances.get(node, float('inf'))
+
+
+    def path_to(self, node):
+        # (path, distance) from the source to 'node', same contract as Graph.find_shortest_path.
+        if node not in self.distances:
+            return [node], float('inf')
+        path = [node]
+        while path[-1] != self.source:
+            path.append(self.parents[path[-1]])
+        path.reverse()
+        return path, self.distances[node]
+
+
+#-----------------------------Graph listener hooks:
+
+    def on_edge_added(self, node1, node2, weight):
+        if self._incoming is not None:
+            self._incoming.setdefault(node2, set()).add(node1)
+        if self.unit_weights:
+            weight = 1
+        heap = []
+        self._relax(node1, node2, weight, heap)
+        if not self.graph.directed:
+            self._relax(node2, node1, weight, heap)
+        self._settle(heap)
+
+
+    def on_edge_removed(self, node1, node2):
+        if self._incoming is not None:
+            self._incoming.setdefault(node2, set()).discard(node1)
+        if self.parents.get(node2) == node1:
+            self._repair_subtree(node2)
+        elif not self.graph.directed and self.parents.get(node1) == node2:
+            self._repair_subtree(node1)
+
+
+#-----------------------------Repair helpers:
+
+    def _set_parent(self, node, parent):
+        old_parent = self.parents.get(node)
+        if old_parent is not None:
+            self.children.setdefault(old_parent, set()).discard(node)
+        self.parents[node] = parent
+        self.children.setdefault(parent, set()).add(node)
+
+
+    def _relax(self, node1, node2, weight, heap):
+        distance = self.distances.get(node1)
+        if distance is None:
+            return
+        alternative_route = distance + weight
+        if alternative_route < self.distances.get(node2, float('inf')):
+            self.distances[node2] = alternative_route
+            self._set_parent(node2, node1)
+            heapq.heappush(heap, (alternative_route, next(self._counter), node2))
+
+
+    def _settle(self, heap):
+        # Local Dijkstra: propagate decreased distances outward from the seeded nodes.
+        while heap:
+            dist, _, node = heapq.heappop(heap)
+            if dist > self.distances.get(node, float('inf')):
+                continue  # Stale heap entry
+            for neighbor in self.graph.graph.get(node, ()):
+                self._relax(node, neighbor, self._weight(node, neighbor), heap)
+
+
+    def _weight(self, node1, node2):
+        return 1 if self.unit_weights else self.graph.weights[(node1, node2)]
+
+
+    def _predecessors(self, node):
+        if self._incoming is not None:
+            return self._incoming.get(node, ())
+        return self.graph.graph.get(node, ())
+
+
+    def _repair_subtree(self, root):
+        # The tree edge into 'root' is gone: recompute distances for root's subtree only.
+        affected = [root]
+        for node in affected:  # Grows while iterating: collects the whole subtree
+            affected.extend(self.children.get(node, ()))
+        affected_set = set(affected)
+        instrumentation.count('incremental_paths.subtree_repairs')
+        instrumentation.count('incremental_paths.nodes_repaired', len(affected))
+
+        self.children.setdefault(self.parents[root], set()).discard(root)
+        for node in affected:
+            del self.distances[node]
+            del self.parents[node]
+            self.children.pop(node, None)
+
+        # Re-seed each affected node from its best unaffected predecessor
+        heap = []
+        for node in affected:
+            for predecessor in self._predecessors(node):
+                if predecessor not in affected_set:
+                    self._relax(predecessor, node, self._weight(predecessor, node), heap)
+        self._settle(heap)
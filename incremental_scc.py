@@ -0,0 +1,465 @@
+from collections import deque
+
+import instrumentation
+import traversal
+from graph import Graph
+
+
+class IncrementalSCC:
+    # Strongly connected components of a directed Graph plus their condensation DAG,
+    # kept in sync through Graph.subscribe() instead of re-running Tarjan every turn.
+    #  - components keep a topological order (Pearce-Kelly): an added edge that agrees
+    #    with it costs O(1); otherwise only the components between its endpoints in that
+    #    order are searched, and the ones on a new cycle are merged,
+    #  - removing an edge inside a component only searches the pieces that break off
+    #    it (see _split), never the rest of the component,
+    #  - removing an edge between components only decrements a DAG edge count.
+    # reaches() answers from a transitive closure kept as one bitmask per component: an
+    # added DAG edge extends it in place, anything that removes reachability marks it
+    # stale and the next query rebuilds it. The closure takes O(C^2) bits for C components,
+    # so above _CLOSURE_LIMIT components reaches() searches the DAG instead (O(C + DAG
+    # edges) per query, pruned by the topological order). A node is reachable from
+    # everywhere iff its component is the only sink of the DAG, which reachable_from_all()
+    # checks in O(1).
+
+    _GAP = 16  # Initial spacing of topological positions
+    _CLOSURE_LIMIT = 4096  # Most components kept in the bitmask closure (2 MB of masks)
+
+    def __init__(self, graph):
+        if not graph.directed:
+            raise ValueError("IncrementalSCC needs a directed graph")
+        self.graph = graph
+        self._component = {}  # node -> component id
+        self._members = {}  # component id -> set of nodes
+        self._successors = {}  # component id -> {successor component: number of edges into it}
+        self._predecessors = {}  # component id -> {predecessor component: number of edges from it}
+        self._order = {}  # component id -> position in a topological order of the DAG
+        self._taken = set()  # Positions in use; positions start _GAP apart so splits fit in between
+        self._end = 0  # Position for the next new node
+        self._sinks = set()  # Components without successors
+        self._incoming = {}  # node -> predecessor nodes, to rebuild the DAG edges of a split
+        self._closure = None  # component id -> bitmask of the components it reaches (None = stale)
+        self._bit = {}  # component id -> its bit in the closure masks
+        self._next_id = 0
+
+        for (node1, node2) in graph.weights:
+            self._incoming.setdefault(node2, set()).add(node1)
+        sccs = traversal.strongly_connected_components(list(graph.graph), graph._neighbors)
+        for scc in reversed(sccs):  # Tarjan completes sink components first
+            self._new_component(set(scc), self._end)
+            self._end += self._GAP
+        for (node1, node2) in graph.weights:
+            if self._component[node1] != self._component[node2]:
+                self._count_edge(self._component[node1], self._component[node2], 1)
+        graph.subscribe(self)
+
+
+    def copy(self, graph):
+        # Index for 'graph', an unchanged copy (e.g. a CowGraph) of this index's graph.
+        clone = IncrementalSCC.__new__(IncrementalSCC)
+        clone.graph = graph
+        clone._component = dict(self._component)
+        clone._members = {component: set(members) for component, members in self._members.items()}
+        clone._successors = {component: dict(edges) for component, edges in self._successors.items()}
+        clone._predecessors = {component: dict(edges) for component, edges in self._predecessors.items()}
+        clone._order = dict(self._order)
+        clone._taken = set(self._taken)
+        clone._end = self._end
+        clone._sinks = set(self._sinks)
+        clone._incoming = {node: set(predecessors) for node, predecessors in self._incoming.items()}
+        clone._closure = None if self._closure is None else dict(self._closure)
+        clone._bit = dict(self._bit)
+        clone._next_id = self._next_id
+        graph.subscribe(clone)
+        return clone
+
+
+    def detach(self):
+        # Stop following graph changes.
+        self.graph.unsubscribe(self)
+
+
+#-----------------------------Queries:
+
+    def component(self, node):
+        # Id of the component holding 'node' (None if the node is not in the graph).
+        if node not in self._component and node not in self.graph.graph:
+            return None
+        return self._ensure(node)
+
+
+    def members(self, component):
+        return set(self._members[component])
+
+
+    def successors(self, component):
+        # Components with an edge from 'component' (its out-neighbors in the condensation DAG).
+        return list(self._successors[component])
+
+
+    def predecessors(self, component):
+        return list(self._predecessors[component])
+
+
+    def components(self):
+        # Every component id, in topological order of the condensation DAG.
+        return sorted(self._order, key=self._order.get)
+
+
+    def condensation(self):
+        # The condensation DAG as a directed Graph over component ids; an edge's weight
+        # is the number of graph edges it stands for.
+        dag = Graph(directed=True, verbose=False, cache_size=0)
+        dag.add_nodes_from(self.components())
+        dag.add_edges_from((component, successor, count)
+                           for component, edges in self._successors.items() for successor, count in edges.items())
+        return dag
+
+
+    def reaches(self, node1, node2):
+        # True if there is a directed path from node1 to node2.
+        if node1 == node2:
+            return node1 in self._component or node1 in self.graph.graph
+        component1, component2 = self.component(node1), self.component(node2)
+        if component1 is None or component2 is None:
+            return False
+        if component1 == component2:
+            return True
+        if len(self._order) > self._CLOSURE_LIMIT:
+            self._closure = None
+            return component2 in self._search(component1, self._successors,
+                                              self._order[component1], self._order[component2])
+        return self._reachability()[component1] >> self._bit[component2] & 1 == 1
+
+
+    def reachable_from_all(self, node):
+        # True if every node of the graph has a path to 'node' (e.g. the goal of a maze).
+        component = self.component(node)
+        return component is not None and len(self._sinks) == 1 and component in self._sinks
+
+
+    def components_not_reaching(self, node):
+        # Components with no path to 'node', in topological order: O(C + DAG edges).
+        target = self.component(node)
+        if target is None:
+            return self.components()
+        reaching = self._search(target, self._predecessors, float('-inf'), self._order[target])
+        return [component for component in self.components() if component not in reaching]
+
+
+#-----------------------------Graph listener hooks:
+
+    def on_edge_added(self, node1, node2, weight):
+        self._incoming.setdefault(node2, set()).add(node1)
+        source, target = self._ensure(node1), self._ensure(node2)
+        if source == target:
+            return
+        new_link = target not in self._successors[source]
+        self._count_edge(source, target, 1)
+        if new_link and self._order[source] > self._order[target]:
+            self._restore_order(source, target)
+
+
+    def on_edge_removed(self, node1, node2):
+        self._incoming[node2].discard(node1)
+        source, target = self._component[node1], self._component[node2]
+        if source != target:
+            self._count_edge(source, target, -1)
+        elif node1 != node2:
+            self._split(source, node1, node2)
+        if not self._incoming[node2] and node2 not in self.graph.graph:
+            self._drop(node2)  # A target-only node that lost its last edge leaves the graph
+
+
+    def on_node_added(self, node):
+        self._ensure(node)
+
+
+#-----------------------------Component bookkeeping:
+
+    def _new_component(self, members, position):
+        component = self._next_id
+        self._next_id += 1
+        self._members[component] = members
+        for node in members:
+            self._component[node] = component
+        self._successors[component] = {}
+        self._predecessors[component] = {}
+        self._order[component] = position
+        self._taken.add(position)
+        self._sinks.add(component)
+        return component
+
+
+    def _ensure(self, node):
+        component = self._component.get(node)
+        if component is None:
+            component = self._new_component({node}, self._end)
+            self._end += self._GAP
+            if self._closure is not None and len(self._bit) >= self._CLOSURE_LIMIT:
+                self._closure = None  # Too many components: reaches() searches the DAG
+            elif self._closure is not None:
+                self._bit[component] = len(self._bit)
+                self._closure[component] = 1 << self._bit[component]
+        return component
+
+
+    def _drop(self, node):
+        # Forget a node without edges (a singleton component).
+        del self._incoming[node]
+        self._detach_component(self._component.pop(node))
+        self._closure = None
+
+
+    def _count_edge(self, source, target, delta):
+        # Add 'delta' graph edges to the DAG edge source -> target (between different components).
+        successors = self._successors[source]
+        count = successors.get(target, 0) + delta
+        if count:
+            successors[target] = self._predecessors[target][source] = count
+            self._sinks.discard(source)
+            if count == delta:
+                self._extend_closure(source, target)
+        else:
+            del successors[target]
+            del self._predecessors[target][source]
+            if not successors:
+                self._sinks.add(source)
+            self._closure = None
+
+
+    def _detach_component(self, component):
+        # Drop a component and every DAG edge touching it (before a merge or split).
+        for successor in self._successors.pop(component):
+            edges = self._predecessors.get(successor)
+            if edges is not None:  # Not detached yet
+                del edges[component]
+        for predecessor in self._predecessors.pop(component):
+            edges = self._successors.get(predecessor)
+            if edges is not None:
+                del edges[component]
+                if not edges:
+                    self._sinks.add(predecessor)
+        self._taken.discard(self._order.pop(component))
+        self._sinks.discard(component)
+        return self._members.pop(component)
+
+
+    def _renumber(self, gap):
+        # Spread all positions 'gap' apart again, keeping their order.
+        instrumentation.count('scc.renumbers')
+        ranked = sorted(self._order, key=self._order.get)
+        self._order = {component: i * gap for i, component in enumerate(ranked)}
+        self._taken = set(self._order.values())
+        self._end = len(ranked) * gap
+
+
+#-----------------------------Edge insertion:
+
+    def _restore_order(self, source, target):
+        # The new DAG edge source -> target runs backwards in the topological order.
+        # Only components positioned between the two can be affected: search forward
+        # from 'target' and backward from 'source' inside that window.
+        lower, upper = self._order[target], self._order[source]
+        forward = self._search(target, self._successors, lower, upper)
+        backward = self._search(source, self._predecessors, lower, upper)
+        instrumentation.count('scc.reorders')
+        instrumentation.count('scc.reorder_components_scanned', len(forward) + len(backward))
+
+        # Reuse the window's positions: the backward set first, the forward set last (so
+        # no forward component moves up past a predecessor outside the window), and the
+        # components of a new cycle merged in between.
+        cycle = forward & backward  # Empty unless 'target' already reached 'source'
+        positions = sorted(self._order[component] for component in forward | backward)
+        first = sorted(backward - cycle, key=self._order.get)
+        last = sorted(forward - cycle, key=self._order.get)
+        if cycle:
+            first.append(self._merge(cycle))
+        self._taken.update(positions)
+        self._taken.difference_update(positions[len(first):len(positions) - len(last)])  # Freed by a merge
+        for component, position in zip(first, positions):
+            self._order[component] = position
+        for component, position in zip(last, positions[len(positions) - len(last):]):
+            self._order[component] = position
+
+
+    def _search(self, start, edges, lower, upper):
+        # Components reachable from 'start' over 'edges' without leaving the [lower, upper] window.
+        order = self._order
+        seen = {start}
+        stack = [start]
+        while stack:
+            for component in edges[stack.pop()]:
+                if component not in seen and lower <= order[component] <= upper:
+                    seen.add(component)
+                    stack.append(component)
+        return seen
+
+
+    def _merge(self, cycle):
+        # Merge the components of a new cycle into the largest one; returns its id.
+        instrumentation.count('scc.merges')
+        instrumentation.count('scc.components_merged', len(cycle))
+        self._closure = None
+        keep = max(cycle, key=lambda component: len(self._members[component]))
+        outgoing, incoming = [], []
+        for component in cycle:
+            if component == keep:
+                continue  # Keeps its members and its DAG edges to the rest of the graph
+            outgoing.extend((successor, count) for successor, count in self._successors[component].items()
+                            if successor not in cycle)
+            incoming.extend((predecessor, count) for predecessor, count in self._predecessors[component].items()
+                            if predecessor not in cycle)
+            moved = self._detach_component(component)  # Also drops keep's edges to it
+            for node in moved:
+                self._component[node] = keep
+            self._members[keep] |= moved
+        for successor, count in outgoing:
+            self._count_edge(keep, successor, count)
+        for predecessor, count in incoming:
+            self._count_edge(predecessor, keep, count)
+        return keep
+
+
+#-----------------------------Edge removal:
+
+    def _split(self, component, tail, head):
+        # The edge tail -> head inside 'component' is gone. Every node still reaches 'tail'
+        # and is still reached from 'head', so the component splits iff 'tail' no longer
+        # reaches 'head', into a DAG of pieces with SCC(head) as its only source and
+        # SCC(tail) as its only sink. A forward search from 'tail' (which can only find
+        # SCC(tail)) and a backward search from 'head' (only SCC(head)) run in lockstep:
+        # if they meet, nothing splits; otherwise the first to run out has found its whole
+        # end piece. Any middle piece reaches that end piece through middle nodes only, so
+        # it is found by searching from the end piece's neighbors; that search also runs
+        # in lockstep with the one from the far endpoint, which claims the remainder.
+        incoming = self._incoming
+        successors = self.graph._neighbors
+        predecessors = lambda node: incoming.get(node, ())
+        of = self._component
+        searches = ((successors, {tail}, deque([tail])), (predecessors, {head}, deque([head])))
+        end = self._lockstep(component, searches, (), (0, 1))
+        if end is None:
+            return
+        instrumentation.count('scc.splits')
+
+        # 'ahead' is the direction the end piece is closed under; the other search, from the
+        # far endpoint, collects the nodes that stay in 'component'
+        end_piece = searches[end][1]
+        ahead, _, _ = searches[end]
+        behind, kept, kept_queue = searches[1 - end]
+        removed = set(end_piece)
+        middle = []  # Middle pieces, each as Tarjan returns them over 'ahead'
+        candidates = deque(node for piece_node in end_piece for node in behind(piece_node)
+                           if of[node] == component and node not in removed)
+        while candidates:
+            start = candidates.popleft()
+            if start in kept or start in removed:
+                continue
+            search = (ahead, {start}, deque([start]))
+            if self._lockstep(component, (search, (behind, kept, kept_queue)), removed, (0,)) is None:
+                kept.add(start)  # Met the far endpoint's search
+                kept_queue.append(start)
+                continue
+            closed = search[1]  # Cannot reach the far endpoint: all middle nodes
+            middle.extend(traversal.strongly_connected_components(
+                list(closed), lambda node: [other for other in ahead(node) if other in closed]))
+            removed |= closed
+            candidates.extend(node for closed_node in closed for node in behind(closed_node)
+                              if of[node] == component and node not in removed)
+
+        # Topological order of the new pieces around the part that keeps the component id
+        if end == 0:  # The end piece is SCC(tail), the sink; middle pieces were peeled sink-first
+            before, after = [], middle[::-1] + [end_piece]
+        else:  # The end piece is SCC(head), the source; middle pieces were peeled source-first
+            before, after = [end_piece] + middle, []
+        self._closure = None
+        for node in removed:  # Move the pieces' edges off the component's DAG edges
+            for other in successors(node):
+                if of[other] != component:
+                    self._count_edge(component, of[other], -1)
+            for other in incoming.get(node, ()):
+                if of[other] != component:
+                    self._count_edge(of[other], component, -1)
+        self._members[component] -= removed
+        shift = len(before) + len(after)  # The pieces take the positions just after the component's
+        position = self._order[component]
+        if any(position + offset in self._taken for offset in range(1, shift + 1)):
+            self._renumber(max(self._GAP, shift + 1))
+            position = self._order[component]
+        self._taken.discard(position)
+        for offset, scc in enumerate(before):
+            self._new_component(set(scc), position + offset)
+        self._order[component] = position + len(before)
+        self._taken.add(position + len(before))
+        for offset, scc in enumerate(after, len(before) + 1):
+            self._new_component(set(scc), position + offset)
+        for node in removed:
+            piece = of[node]
+            for other in successors(node):
+                if of[other] != piece:
+                    self._count_edge(piece, of[other], 1)
+            for other in incoming.get(node, ()):
+                if other not in removed and of[other] != piece:
+                    self._count_edge(of[other], piece, 1)
+
+
+    def _lockstep(self, component, searches, excluded, finish):
+        # Advance two searches (neighbors, seen, queue) inside 'component', one node each
+        # in turn, skipping 'excluded' nodes. Returns None once they meet, else the index
+        # of the first search in 'finish' that ran out (its 'seen' is then complete); a
+        # search not in 'finish' that runs out just stops.
+        of = self._component
+        scanned = 0
+        try:
+            while True:
+                for side in (0, 1):
+                    neighbors, seen, queue = searches[side]
+                    if not queue:
+                        if side in finish:
+                            return side
+                        continue
+                    node = queue.popleft()
+                    scanned += 1
+                    other_seen = searches[1 - side][1]
+                    for other in neighbors(node):
+                        if other in seen or of[other] != component or other in excluded:
+                            continue
+                        if other in other_seen:
+                            return None
+                        seen.add(other)
+                        queue.append(other)
+        finally:
+            instrumentation.count('scc.split_nodes_scanned', scanned)
+
+
+#-----------------------------Reachability closure:
+
+    def _reachability(self):
+        # component id -> bitmask of reachable components, rebuilt in reverse topological
+        # order when stale: O(C + DAG edges) big-int ORs of C bits each.
+        if self._closure is None:
+            instrumentation.count('scc.closure_rebuilds')
+            ranked = sorted(self._order, key=self._order.get)
+            self._bit = {component: bit for bit, component in enumerate(ranked)}
+            closure = {}
+            for component in reversed(ranked):
+                mask = 1 << self._bit[component]
+                for successor in self._successors[component]:
+                    mask |= closure[successor]
+                closure[component] = mask
+            self._closure = closure
+        return self._closure
+
+
+    def _extend_closure(self, source, target):
+        # New DAG edge source -> target: everything that reaches 'source' now reaches
+        # whatever 'target' reaches.
+        closure = self._closure
+        if closure is None or closure[source] >> self._bit[target] & 1:
+            return
+        source_bit = 1 << self._bit[source]
+        reached = closure[target]
+        for component, mask in closure.items():
+            if mask & source_bit:
+                closure[component] = mask | reached
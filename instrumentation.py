@@ -0,0 +1,98 @@
+# Opt-in counters and timers for Graph, index and MazeGame operations.
+#
+#   with instrumentation.collect() as stats:
+#       graph.find_shortest_path('A', 'I')
+#   print(stats.to_json())
+#
+# Nothing is recorded unless a collect() block is active. Disabled, a @timed method
+# costs one extra call and a global check, and count() returns after the same check;
+# counters inside hot loops are derived after the loop rather than incremented in it.
+# Per-edge mutations (Graph.add_edge/remove_edge) are counted but not timed.
+import functools
+import json
+import time
+
+_current = None  # Stats of the innermost active collect() block
+
+
+class Stats:
+    # Counters (name -> int) and per-operation call counts and total time.
+
+    def __init__(self):
+        self.counters = {}
+        self.calls = {}
+        self.seconds = {}
+
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+
+    def record_call(self, operation, seconds):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        self.seconds[operation] = self.seconds.get(operation, 0.0) + seconds
+
+
+    def reset(self):
+        self.counters.clear()
+        self.calls.clear()
+        self.seconds.clear()
+
+
+    def as_dict(self):
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'operations': {operation: {'calls': self.calls[operation], 'seconds': self.seconds[operation]}
+                           for operation in sorted(self.calls)},
+        }
+
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+class collect:
+    # Context manager that routes counters and timers into a Stats object.
+    # Nested blocks collect into the innermost one; pass 'stats' to keep accumulating.
+
+    def __init__(self, stats=None):
+        self.stats = stats if stats is not None else Stats()
+        self._previous = None
+
+    def __enter__(self):
+        global _current
+        self._previous = _current
+        _current = self.stats
+        return self.stats
+
+    def __exit__(self, *exc_info):
+        global _current
+        _current = self._previous
+        return False
+
+
+def enabled():
+    return _current is not None
+
+
+def count(name, amount=1):
+    # Add 'amount' to counter 'name' if a collect() block is active.
+    if _current is not None:
+        _current.count(name, amount)
+
+
+def timed(function):
+    # Method decorator: count calls and total wall time under 'Class.method'.
+    operation = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        stats = _current
+        if stats is None:
+            return function(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record_call(operation, time.perf_counter() - started)
+    return wrapper
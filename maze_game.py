@@ -1,65 +1,167 @@
+import copy
 import random
+
+import instrumentation
+import maze_generator
 from graph import Graph
+from cow_graph import CowGraph
+from connectivity import DynamicConnectivity
+from edge_sampler import EdgeSampler
+from goal_oracle import GoalOracle
+from graph_history import GraphHistory
 
 class MazeGame:
     # Dynamic maze (labyrinth) game logic.
 
-    def __init__(self):
-        self.graph = Graph(directed=False)
+    def __init__(self, seed=None, verbose=True, graph=None, changes_per_turn=1):
+        # 'seed' makes the graph dynamics reproducible; verbose=False silences all game messages.
+        # 'changes_per_turn' edges are added and as many removed by each apply_dynamics() call.
+        # 'graph' plays on an existing undirected graph (e.g. a CowGraph over a shared maze)
+        # instead of a fresh one; call set_endpoints() instead of setup_game() then.
+        self.random = random.Random(seed)
+        self.verbose = verbose
+        self.graph = graph if graph is not None else Graph(directed=False, verbose=verbose)
+        self.connectivity = DynamicConnectivity(self.graph)  # Bridge index, follows every add/remove_edge
+        self.edges = EdgeSampler(self.graph)  # O(1) random edges / non-edges for the dynamics
+        self.changes_per_turn = changes_per_turn
         self.start = None
         self.end = None
         self.powers = {'view_graph': 3, 'block_dynamics': 1, 'teleport': 1}  # Player powers
         self.show_graph_turns = 0  # Counter for "view graph for 3 turns"
+        self._oracle = None  # GoalOracle, built on first use (see the oracle property)
+        self.history = None  # GraphHistory once record_history() is called
 
 
     def setup_game(self, nodes, edges, start, end):
         # Set up the maze with nodes, edges, start, and end.
-        for node in nodes:
-            self.graph.add_node(node)
-        for edge in edges:
-            self.graph.add_edge(*edge)
+        self.graph.add_nodes_from(nodes)
+        self.graph.add_edges_from(edges)
+        self.set_endpoints(start, end)
+
+
+    def set_endpoints(self, start, end):
+        # Set the start and goal on the current graph.
         self.start = start
         self.end = end
+        if self._oracle is not None:
+            self._oracle.detach()
+            self._oracle = None
+
+
+    @property
+    def oracle(self):
+        # Distances to the goal and ranked candidates (GoalOracle). Built on first use, since
+        # from then on every edge change repairs it: on big mazes that repair costs several
+        # times the rest of apply_dynamics(), and games that never ask pay nothing.
+        if self._oracle is None and self.end is not None:
+            self._oracle = GoalOracle(self.graph, self.end)
+        return self._oracle
+
+
+    @property
+    def goal_paths(self):
+        # The oracle's shortest-path tree rooted at the goal.
+        return self.oracle.paths
+
+
+    def fork(self, seed=None):
+        # New game on a copy-on-write overlay (CowGraph) of this game's graph, whose indexes
+        # are copy-on-write too: the fork only stores what its own edge changes touch. This
+        # game's graph is read-only from then on (its indexes share their state with the fork's),
+        # so fork from a template game that is never played (see maze_server.py).
+        game = copy.copy(self)
+        game.random = random.Random(seed)
+        game.graph = CowGraph(self.graph, verbose=self.verbose)
+        game.connectivity = self.connectivity.copy(game.graph)
+        game.edges = self.edges.copy(game.graph)
+        if self._oracle is not None:  # Shared copy-on-write; otherwise the fork builds its own if asked
+            game._oracle = self._oracle.copy(game.graph)
+        game.powers = dict(self.powers)
+        game.history = None
+        return game
+
+
+    def record_history(self, checkpoint_every=None):
+        # Start logging edge changes; every apply_dynamics() call then ends one turn,
+        # and self.history.graph_at(turn) rebuilds the maze as it was after that turn.
+        if self.history is not None:
+            self.history.detach()
+        self.history = GraphHistory(self.graph, checkpoint_every)
+        return self.history
+
+
+    def setup_generated(self, width, height, algorithm='kruskal', braid=0.0, weights=(1, 10), seed=None):
+        # Set up a procedurally generated width x height maze (see maze_generator.py),
+        # streamed into the graph; start and goal are opposite corners.
+        # seed=None derives the layout from the game's own random generator.
+        if seed is None:
+            seed = self.random.getrandbits(64)
+        edges = maze_generator.iter_maze_edges(width, height, algorithm, braid, weights, seed)
+        self.setup_game(range(width * height), edges, 0, width * height - 1)
+
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+
+    def distance_to_goal(self, position):
+        # Shortest distance from 'position' to the goal (the maze is undirected).
+        return self.oracle.distance(position)
+
+
+    def hops_to_goal(self, position):
+        # Fewest moves from 'position' to the goal.
+        return self.oracle.hop_distance(position)
 
 
+    def path_to_goal(self, position):
+        # (path, distance) from 'position' to the goal.
+        path, distance = self.goal_paths.path_to(position)
+        path.reverse()
+        return path, distance
+
+
+    @instrumentation.timed
     def apply_dynamics(self, block_dynamics=False):
         # Ensure at least one edge is added and one edge is removed per turn, while keeping the graph connected.
+        # Each call is one turn of the recorded history, even when the dynamics are blocked.
         if block_dynamics:
-            print("Graph dynamics blocked this turn!")
-            return
-
-        nodes = list(self.graph.graph.keys())
-
-        # Ensure adding a new edge
-        if len(nodes) > 1:
-            added = False
-            for _ in range(10):  # Try up to 10 times to find a valid pair
-                node1, node2 = random.sample(nodes, 2)
-                if node2 not in self.graph.graph[node1]:  # Only add if no edge exists
-                    self.graph.add_edge(node1, node2, random.randint(1, 10))
-                    added = True
-                    break
-            if not added:
-                print("No valid edge to add this turn.")
+            self._log("Graph dynamics blocked this turn!")
+        else:
+            self._change_edges()
+        if self.history is not None:
+            self.history.mark_turn()
 
-        # Ensure removing an edge while keeping the graph connected
-        if len(nodes) > 1:
-            removed = False
-            for _ in range(10):  # Try up to 10 times to find a valid edge
-                node1, node2 = random.sample(nodes, 2)
-                if node2 in self.graph.graph[node1]:  # Only remove if edge exists
-                    self.graph.remove_edge(node1, node2)
 
-                    # Check if the graph is still connected
-                    components = self.graph.connected_components()
-                    if len(components) == 1:  # Graph is still connected
-                        removed = True
-                        break
-                    else:  # Graph would be disconnected, re-add the edge
-                        self.graph.add_edge(node1, node2, random.randint(1, 10))
+    def _change_edges(self):
+        # 'changes_per_turn' additions, then as many removals. Pairs and edges are drawn
+        # uniformly from the edge sampler, so no node list is rebuilt and a removal draw
+        # always hits an existing edge; each draw still gets up to 10 tries.
+        added = removed = 0
+        for _ in range(self.changes_per_turn):
+            pair = self.edges.sample_non_edge(self.random, tries=10)
+            if pair is not None:
+                self.graph.add_edge(pair[0], pair[1], self.random.randint(1, 10))
+                added += 1
+        if not added:
+            self._log("No valid edge to add this turn.")
 
-            if not removed:
-                print("No valid edge to remove this turn.")
+        # Removing a bridge would disconnect the graph, so bridges are skipped
+        attempts = 0
+        for _ in range(self.changes_per_turn):
+            for _ in range(10):
+                attempts += 1
+                edge = self.edges.sample_edge(self.random)
+                if edge is None:
+                    break
+                if not self.connectivity.is_bridge(*edge):
+                    self.graph.remove_edge(*edge)
+                    removed += 1
+                    break
+        instrumentation.count('dynamics.remove_attempts', attempts)
+        if not removed:
+            self._log("No valid edge to remove this turn.")
 
 
     def use_power(self):
@@ -70,35 +172,55 @@ class MazeGame:
         print(f"3. Teleport to an unconnected node ({self.powers['teleport']} left)")
         choice = input("Choose a power (1/2/3 or press Enter to skip): ")
 
-        if choice == '1' and self.powers['view_graph'] > 0:
-            self.show_graph_turns = 3
-            self.powers['view_graph'] -= 1
-            print("You can now view the graph structure for the next 3 turns!")
-            return 'view_graph'
-        elif choice == '2' and self.powers['block_dynamics'] > 0:
-            self.powers['block_dynamics'] -= 1
-            print("You have blocked graph dynamics for the next turn!")
-            return 'block_dynamics'
-        elif choice == '3' and self.powers['teleport'] > 0:
-            self.powers['teleport'] -= 1
-            return 'teleport'
-        elif choice == '':
+        if choice == '':
             print("You chose to skip using a power.")
-        else:
+            return None
+        power = {'1': 'view_graph', '2': 'block_dynamics', '3': 'teleport'}.get(choice)
+        activated = self.activate_power(power)
+        if activated is None:
             print("Invalid choice or no powers left for this option!")
-        return None
+        return activated
 
 
-    def teleport(self, current_position):
+    def activate_power(self, power):
+        # Spend one charge of 'power' if any is left. Returns the power name, or None if unavailable.
+        if power not in self.powers or self.powers[power] <= 0:
+            return None
+        self.powers[power] -= 1
+        if power == 'view_graph':
+            self.show_graph_turns = 3
+            self._log("You can now view the graph structure for the next 3 turns!")
+        elif power == 'block_dynamics':
+            self._log("You have blocked graph dynamics for the next turn!")
+        return power
+
+
+    def teleport_candidates(self, current_position, limit=None):
+        # Nodes the player may teleport to: not the current node, not the goal, not adjacent
+        # (and connected to the goal), closest to the goal first; at most 'limit' of them.
+        return self.oracle.teleport_candidates(current_position, limit)
+
+
+    def is_valid_teleport(self, current_position, target):
+        # Same rule as teleport_candidates(), checked for a single target in O(1).
+        return (target in self.graph.graph and target != current_position and target != self.end
+                and (current_position, target) not in self.graph.weights and self.connectivity.connected(target, self.end))
+
+
+    def is_valid_move(self, current_position, target):
+        # A move must follow an existing edge.
+        return (current_position, target) in self.graph.weights
+
+
+    def teleport(self, current_position, shown=10):
         # Teleport the player to an unconnected node.
-        # Get the unconnected nodes excluding the current and end positions
-        unconnected_nodes = [node for node in self.graph.graph if
-                             node != current_position and node != self.end and node not in self.graph.graph[current_position]]
+        # Offer the 'shown' unconnected nodes closest to the goal; any valid target is accepted
+        unconnected_nodes = self.teleport_candidates(current_position, shown)
 
         if unconnected_nodes:
-            print(f"Available nodes to teleport to: {unconnected_nodes}")
-            target = input(f"Choose a node to teleport to {unconnected_nodes}: ")
-            if target in unconnected_nodes:
+            print(f"Available nodes to teleport to (closest to the goal first): {unconnected_nodes}")
+            target = self._parse_node(input(f"Choose a node to teleport to {unconnected_nodes}: "))
+            if self.is_valid_teleport(current_position, target):
                 print(f"Teleported to {target}")
                 return target  # Return the new position
             else:
@@ -144,11 +266,22 @@ class MazeGame:
                 break  # Exit the loop if the player has reached the goal
 
             # Player chooses a move
-            move = input(f"Choose your next node from {self.graph.graph[current_position]}: ")
-            if move in self.graph.graph[current_position]:  # Valid move to an adjacent node
+            move = self._parse_node(input(f"Choose your next node from {self.oracle.move_candidates(current_position)}: "))
+            if self.is_valid_move(current_position, move):  # Valid move to an adjacent node
                 current_position = move  # Update current position
                 print(f"Moved to {current_position}")
             else:
                 print("Invalid move!")
 
         print("Game finished!")  # Message after reaching the goal
+
+
+    def _parse_node(self, text):
+        # input() always returns a string; generated mazes use int labels.
+        if text in self.graph.graph:
+            return text
+        try:
+            node = int(text)
+        except ValueError:
+            return text
+        return node if node in self.graph.graph else text
@@ -0,0 +1,148 @@
+import random
+
+
+# Procedural grid mazes for MazeGame.setup_game / Graph.add_edges_from.
+# Cells are int labels row * width + col; edges are streamed as (cell1, cell2, weight)
+# so a multi-million-cell maze goes straight into the bulk ingestion path without
+# building an intermediate edge list. Open walls are tracked as a 4-bit mask per cell
+# in a bytearray (one byte per cell instead of a set of pairs).
+#   'kruskal'     - randomized Kruskal over the shuffled walls (union-find)
+#   'backtracker' - randomized depth-first carving (long, winding corridors)
+# Both give a perfect maze (a spanning tree); 'braid' in [0, 1] is the fraction of
+# dead ends then opened into a neighboring cell, adding loops (braid=1 leaves none).
+ALGORITHMS = ('kruskal', 'backtracker')
+
+_RIGHT, _DOWN, _LEFT, _UP = 1, 2, 4, 8
+_DEAD_END_MASKS = (_RIGHT, _DOWN, _LEFT, _UP)  # Exactly one open wall
+
+
+def iter_maze_edges(width, height, algorithm='kruskal', braid=0.0, weights=(1, 1), seed=None):
+    # Yield the maze's (cell1, cell2, weight) edges; weights are uniform ints in the 'weights' range.
+    if width < 1 or height < 1:
+        raise ValueError("Maze needs at least one cell")
+    rng = random.Random(seed)
+    opened = bytearray(width * height)
+    if algorithm == 'kruskal':
+        edges = _kruskal(width, height, rng, opened)
+    elif algorithm == 'backtracker':
+        edges = _backtracker(width, height, rng, opened)
+    else:
+        raise ValueError(f"Unknown maze algorithm: {algorithm!r}")
+
+    low, high = weights
+    for cell1, cell2 in edges:
+        yield cell1, cell2, (rng.randint(low, high) if high > low else low)
+    if braid > 0:
+        for cell1, cell2 in _braid(width, height, braid, rng, opened):
+            yield cell1, cell2, (rng.randint(low, high) if high > low else low)
+
+
+def generate_maze(width, height, algorithm='kruskal', braid=0.0, weights=(1, 1), seed=None):
+    # (nodes, edges, start, end) in the simulation.DEFAULT_MAZE shape, start and goal in
+    # opposite corners. Materializes the edges; use iter_maze_edges() to stream them.
+    edges = list(iter_maze_edges(width, height, algorithm, braid, weights, seed))
+    return list(range(width * height)), edges, 0, width * height - 1
+
+
+class GridCoordinates:
+    # node -> (x, y) for generated mazes without building a dict (usable with heuristics.manhattan).
+
+    def __init__(self, width):
+        self.width = width
+
+    def __getitem__(self, node):
+        row, col = divmod(node, self.width)
+        return col, row
+
+
+def _kruskal(width, height, rng, opened):
+    # Walls are encoded as cell * 2 + (0: wall to the right, 1: wall below).
+    walls = []
+    for row in range(height):
+        base = row * width
+        for cell in range(base, base + width):
+            if cell + 1 < base + width:
+                walls.append(cell << 1)
+            if row + 1 < height:
+                walls.append(cell << 1 | 1)
+    rng.shuffle(walls)
+
+    parent = list(range(width * height))
+    remaining = width * height - 1  # Tree edges still to place
+    for wall in walls:
+        if not remaining:
+            return
+        cell = wall >> 1
+        other = cell + width if wall & 1 else cell + 1
+        root1 = cell
+        while parent[root1] != root1:  # Find with path halving
+            parent[root1] = parent[parent[root1]]
+            root1 = parent[root1]
+        root2 = other
+        while parent[root2] != root2:
+            parent[root2] = parent[parent[root2]]
+            root2 = parent[root2]
+        if root1 != root2:
+            parent[root1] = root2
+            if wall & 1:
+                opened[cell] |= _DOWN
+                opened[other] |= _UP
+            else:
+                opened[cell] |= _RIGHT
+                opened[other] |= _LEFT
+            remaining -= 1
+            yield cell, other
+
+
+def _backtracker(width, height, rng, opened):
+    # Iterative randomized DFS: carve into a random unvisited neighbor, backtrack when stuck.
+    visited = bytearray(width * height)
+    start = rng.randrange(width * height)
+    visited[start] = 1
+    stack = [start]
+    while stack:
+        cell = stack[-1]
+        row, col = divmod(cell, width)
+        candidates = []
+        if col + 1 < width and not visited[cell + 1]:
+            candidates.append((cell + 1, _RIGHT, _LEFT))
+        if row + 1 < height and not visited[cell + width]:
+            candidates.append((cell + width, _DOWN, _UP))
+        if col > 0 and not visited[cell - 1]:
+            candidates.append((cell - 1, _LEFT, _RIGHT))
+        if row > 0 and not visited[cell - width]:
+            candidates.append((cell - width, _UP, _DOWN))
+        if not candidates:
+            stack.pop()
+            continue
+        other, wall, back = candidates[rng.randrange(len(candidates))]
+        visited[other] = 1
+        opened[cell] |= wall
+        opened[other] |= back
+        stack.append(other)
+        yield cell, other
+
+
+def _braid(width, height, braid, rng, opened):
+    # Open one closed wall of a 'braid' fraction of the dead ends, preferring walls
+    # into another dead end so a single new edge can remove two of them.
+    for cell in range(width * height):
+        if opened[cell] not in _DEAD_END_MASKS or rng.random() >= braid:
+            continue
+        row, col = divmod(cell, width)
+        closed = []
+        if col + 1 < width and not opened[cell] & _RIGHT:
+            closed.append((cell + 1, _RIGHT, _LEFT))
+        if row + 1 < height and not opened[cell] & _DOWN:
+            closed.append((cell + width, _DOWN, _UP))
+        if col > 0 and not opened[cell] & _LEFT:
+            closed.append((cell - 1, _LEFT, _RIGHT))
+        if row > 0 and not opened[cell] & _UP:
+            closed.append((cell - width, _UP, _DOWN))
+        if not closed:
+            continue  # 1-wide maze: nothing to open
+        dead_ends = [wall for wall in closed if opened[wall[0]] in _DEAD_END_MASKS]
+        other, wall, back = rng.choice(dead_ends or closed)
+        opened[cell] |= wall
+        opened[other] |= back
+        yield cell, other
@@ -0,0 +1,93 @@
+# Load-test client for maze_server.py: many concurrent sessions, per-turn latency percentiles.
+#
+#   python maze_server.py --port 8765 &
+#   python maze_loadtest.py --port 8765 --clients 100 --sessions-per-client 20 --turns 50
+#
+# Each client opens one connection, creates its sessions and plays them round-robin
+# (mostly following the server's hint, sometimes a random neighbor; only random neighbors
+# unless the server runs with --hints). A turn's latency covers both of its requests
+# (start_turn and finish_turn).
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+async def _request(reader, writer, message):
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return response
+
+
+async def run_client(client_id, connect, maze, sessions, turns, latencies, explore=0.2):
+    rng = random.Random(client_id)
+    reader, writer = await connect()
+    try:
+        states = [await _request(reader, writer, {'op': 'new', 'maze': maze, 'seed': client_id * sessions + i})
+                  for i in range(sessions)]
+        for _ in range(turns):
+            states = [state for state in states if not state['finished']]
+            if not states:
+                break
+            for i, state in enumerate(states):
+                started = time.perf_counter()
+                state = await _request(reader, writer, {'op': 'start_turn', 'session': state['session']})
+                if not state['finished']:
+                    move = state['hint']
+                    if state['neighbors'] and (move is None or rng.random() < explore):
+                        move = rng.choice(state['neighbors'])
+                    state = await _request(reader, writer, {'op': 'finish_turn', 'session': state['session'], 'move': move})
+                latencies.append(time.perf_counter() - started)
+                states[i] = state
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list.
+    if not sorted_values:
+        return float('nan')
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_load_test(connect, clients=50, sessions_per_client=10, turns=20, maze='default'):
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(i, connect, maze, sessions_per_client, turns, latencies)
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    report = {'sessions': clients * sessions_per_client, 'turns': len(latencies), 'elapsed_seconds': elapsed,
+              'turns_per_second': len(latencies) / elapsed if elapsed else 0.0}
+    for name, fraction in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99), ('max', 1.0)):
+        report[f'latency_{name}_ms'] = percentile(latencies, fraction) * 1000
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a maze_server.py instance.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="connect to this Unix socket path instead of TCP")
+    parser.add_argument('--clients', type=int, default=50, help="concurrent connections")
+    parser.add_argument('--sessions-per-client', type=int, default=10)
+    parser.add_argument('--turns', type=int, default=20, help="turns per session (at most)")
+    parser.add_argument('--maze', default='default')
+    args = parser.parse_args()
+
+    if args.unix:
+        connect = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        connect = lambda: asyncio.open_connection(args.host, args.port)
+    report = asyncio.run(run_load_test(connect, args.clients, args.sessions_per_client, args.turns, args.maze))
+    for key, value in report.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
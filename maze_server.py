@@ -0,0 +1,172 @@
+# Asyncio MazeGame server: thousands of concurrent headless sessions in one event loop.
+#
+#   python maze_server.py --port 8765                     # TCP on 127.0.0.1
+#   python maze_server.py --unix /tmp/maze.sock --maze 100x100
+#
+# Protocol: one JSON object per line in each direction. A turn is two requests,
+# mirroring MazeSession: start_turn (optional power, then the graph dynamics) and
+# finish_turn (the move, chosen after seeing the changed maze).
+#   {"op": "new", "maze": "default", "seed": 1}                 -> session state
+#   {"op": "start_turn", "session": 1, "power": null, "target": null}
+#   {"op": "finish_turn", "session": 1, "move": "B"}
+#   {"op": "state", "session": 1}
+#   {"op": "close", "session": 1}                               -> {"closed": 1}
+# A session state is {"session", "position", "goal", "neighbors", "hint" (next hop on
+# the current shortest path; null unless the server runs with --hints), "turns",
+# "powers", "finished"}; failures are {"error": ...}.
+#
+# Every session of a maze plays on a CowGraph over one shared read-only base graph,
+# with copy-on-write indexes, so a session only stores what its own dynamics changed.
+import argparse
+import asyncio
+import itertools
+import json
+
+import maze_generator
+from maze_game import MazeGame
+from simulation import DEFAULT_MAZE, MazeSession
+
+
+class MazeServer:
+    # Session registry over shared base mazes; handle() is the transport-independent entry point.
+
+    def __init__(self, mazes, max_sessions=10000, hints=False):
+        # 'mazes' maps a name to (nodes, edges, start, end). Each is built once as a template
+        # game that is never played; sessions fork it (shared graph and indexes, copy-on-write).
+        # hints=True sends the next hop toward the goal with every state; each session then
+        # repairs its distances to the goal (MazeGame.oracle) on every turn.
+        self.mazes = {}
+        self.hints = hints
+        for name, (nodes, edges, start, end) in mazes.items():
+            template = MazeGame(verbose=False)
+            template.setup_game(nodes, edges, start, end)
+            if hints:
+                template.distance_to_goal(start)  # Builds the oracle once, for the sessions to share
+            self.mazes[name] = template
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self._ids = itertools.count(1)
+
+
+#-----------------------------Session API (synchronous, one call per request):
+
+    def new_session(self, maze='default', seed=None):
+        if maze not in self.mazes:
+            raise ValueError(f"Unknown maze: {maze!r}")
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError("Too many sessions")
+        game = self.mazes[maze].fork(seed)
+        session_id = next(self._ids)
+        self.sessions[session_id] = MazeSession(game)
+        return session_id
+
+
+    def state(self, session_id):
+        session = self._session(session_id)
+        game = session.game
+        return {
+            'session': session_id,
+            'position': session.position,
+            'goal': game.end,
+            'neighbors': list(game.graph.graph.get(session.position, ())),
+            'hint': game.goal_paths.parents.get(session.position) if self.hints else None,
+            'turns': session.turns,
+            'powers': dict(game.powers),
+            'finished': session.finished,
+        }
+
+
+    def handle(self, request):
+        # Dispatch one decoded request; returns the response dict.
+        op = request.get('op')
+        if op == 'new':
+            return self.state(self.new_session(request.get('maze', 'default'), request.get('seed')))
+        session_id = request.get('session')
+        if op == 'start_turn':
+            session = self._session(session_id)
+            if not session.finished:
+                session.start_turn(request.get('power'), request.get('target'))
+        elif op == 'finish_turn':
+            session = self._session(session_id)
+            if not session.finished:
+                session.finish_turn(request.get('move'))
+        elif op == 'close':
+            self._session(session_id)
+            del self.sessions[session_id]
+            return {'closed': session_id}
+        elif op != 'state':
+            raise ValueError(f"Unknown op: {op!r}")
+        return self.state(session_id)
+
+
+    def _session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise ValueError(f"Unknown session: {session_id!r}")
+        return session
+
+
+#-----------------------------Network front end:
+
+    async def serve_connection(self, reader, writer):
+        # Sessions opened on a connection are dropped when it closes.
+        opened = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = self.handle(request)
+                except (ValueError, TypeError, AttributeError) as error:
+                    response = {'error': str(error)}
+                if isinstance(request, dict) and request.get('op') == 'new' and 'session' in response:
+                    opened.add(response['session'])
+                elif 'closed' in response:
+                    opened.discard(response['closed'])
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in opened:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.serve_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.serve_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio MazeGame server (JSON lines).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--maze', metavar='WIDTHxHEIGHT', help="also serve a generated maze named 'generated'")
+    parser.add_argument('--braid', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the generated maze")
+    parser.add_argument('--max-sessions', type=int, default=10000)
+    parser.add_argument('--hints', action='store_true', help="send the next hop toward the goal with every state")
+    args = parser.parse_args()
+
+    mazes = {'default': DEFAULT_MAZE}
+    if args.maze:
+        width, height = (int(size) for size in args.maze.lower().split('x'))
+        mazes['generated'] = maze_generator.generate_maze(width, height, braid=args.braid, weights=(1, 10), seed=args.seed)
+    server = MazeServer(mazes, max_sessions=args.max_sessions, hints=args.hints)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
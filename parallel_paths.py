@@ -0,0 +1,193 @@
+# Many-source / all-pairs shortest-path distances, sharded across a process pool.
+#
+#   matrix = parallel_paths.distance_matrix(graph, workers=4)
+#   matrix.distance('A', 'I')
+#
+# The graph is frozen to CSR arrays (CompactGraph) and copied once into
+# multiprocessing.shared_memory blocks; every worker maps the same blocks instead of
+# unpickling its own copy of the graph. Each worker runs one Dijkstra per source of its
+# shard and writes the row straight into the shared float64 output matrix, which can
+# also be a file on disk (output='distances.bin'), memory-mapped by every process.
+import heapq
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from compact_graph import CompactGraph, _typecode
+
+_shared = None  # Worker state: (offsets, targets, weights, output, num_nodes, handles to keep alive)
+
+
+class DistanceMatrix:
+    # Row-major float64 matrix: one row per source, one column per node (in 'labels'
+    # order); unreachable pairs are inf. Call close() (or use it as a context manager)
+    # to release the shared memory or the file mapping.
+
+    def __init__(self, labels, sources, buffer, handle, filename=None):
+        self.labels = labels
+        self.sources = sources
+        self.filename = filename  # Backing file, if the matrix lives on disk
+        self._index = {label: i for i, label in enumerate(labels)}
+        self._rows = {source: i for i, source in enumerate(sources)}
+        self._buffer = buffer  # memoryview cast to 'd', exactly rows x columns long
+        self._handle = handle  # SharedMemory or mmap behind the buffer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @property
+    def shape(self):
+        return len(self.sources), len(self.labels)
+
+    def distance(self, source, target):
+        return self._buffer[self._rows[source] * len(self.labels) + self._index[target]]
+
+    def row(self, source):
+        # {node: distance} for one source.
+        start = self._rows[source] * len(self.labels)
+        return dict(zip(self.labels, self._buffer[start:start + len(self.labels)].tolist()))
+
+    def as_numpy(self):
+        # Zero-copy (sources x nodes) NumPy view; valid until close(). NumPy is optional.
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("DistanceMatrix.as_numpy() requires numpy")
+        return np.frombuffer(self._buffer, dtype=np.float64).reshape(self.shape)
+
+    def close(self):
+        if self._handle is None:
+            return
+        self._buffer.release()
+        if isinstance(self._handle, shared_memory.SharedMemory):
+            self._handle.close()
+            self._handle.unlink()
+        else:
+            self._handle.close()
+        self._handle = None
+
+
+def distance_matrix(graph, sources=None, workers=None, output=None, chunk_size=None):
+    # Distances from every source (default: every node) to every node of 'graph'
+    # (a Graph or CompactGraph). workers=None uses all cores, 1 runs in-process.
+    # 'output' names a file to hold the matrix instead of shared memory.
+    compact = graph if isinstance(graph, CompactGraph) else graph.freeze()
+    labels = list(compact.labels)
+    num_nodes = len(labels)
+    if sources is None:
+        sources = labels
+    sources = list(sources)
+    source_ids = [compact.index[source] for source in sources]
+    workers = workers or os.cpu_count() or 1
+
+    sections = [_share(section) for section in (compact.offsets, compact.targets, compact.weights)]
+    output_size = max(8, 8 * len(sources) * num_nodes)  # A size-0 block or mapping is not allowed
+    if output is None:
+        handle = shared_memory.SharedMemory(create=True, size=output_size)
+        output_spec = ('shm', handle.name)
+    else:
+        with open(output, 'wb') as file:
+            file.truncate(output_size)
+        output_spec = ('file', output)
+
+    # Shards: a few per worker so uneven rows still balance out
+    if chunk_size is None:
+        chunk_size = max(1, len(source_ids) // (workers * 4))
+    tasks = [(first, source_ids[first:first + chunk_size]) for first in range(0, len(source_ids), chunk_size)]
+    specs = [spec for spec, _ in sections]
+    try:
+        if workers == 1:
+            _attach(specs, output_spec, num_nodes)
+            try:
+                for task in tasks:
+                    _solve_rows(*task)
+            finally:
+                _detach()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(specs, output_spec, num_nodes)) as pool:
+                list(pool.map(_solve_rows, *zip(*tasks)))
+    finally:
+        for _, block in sections:
+            block.close()
+            block.unlink()
+
+    if output is not None:
+        with open(output, 'r+b') as file:
+            handle = mmap.mmap(file.fileno(), output_size)
+    buffer = memoryview(handle.buf if output is None else handle)[:8 * len(sources) * num_nodes].cast('d')
+    return DistanceMatrix(labels, sources, buffer, handle, output)
+
+
+#-----------------------------Shared-memory plumbing:
+
+def _share(values):
+    # Copy an array into a new shared-memory block; returns ((name, typecode, length), block).
+    typecode = _typecode(values)
+    data = memoryview(values).cast('B')
+    block = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+    block.buf[:data.nbytes] = data
+    return (block.name, typecode, len(values)), block
+
+
+def _attach(specs, output_spec, num_nodes):
+    # Pool initializer (also used in-process): map the CSR blocks and the output matrix.
+    global _shared
+    handles = []
+    views = []
+    for name, typecode, length in specs:
+        block = shared_memory.SharedMemory(name=name)
+        handles.append(block)
+        views.append(block.buf[:length * array(typecode).itemsize].cast(typecode))  # Blocks may be padded
+    kind, name = output_spec
+    if kind == 'shm':
+        block = shared_memory.SharedMemory(name=name)
+        handles.append(block)
+        output = block.buf.cast('d')
+    else:
+        with open(name, 'r+b') as file:
+            mapping = mmap.mmap(file.fileno(), 0)
+        handles.append(mapping)
+        output = memoryview(mapping).cast('d')
+    _shared = (views[0], views[1], views[2], output, num_nodes, handles)
+
+
+def _detach():
+    global _shared
+    offsets, targets, weights, output, _, handles = _shared
+    for view in (offsets, targets, weights, output):
+        view.release()
+    for handle in handles:
+        handle.close()
+    _shared = None
+
+
+def _solve_rows(first_row, source_ids):
+    # One full Dijkstra per source over the shared CSR; row i of the shard goes to first_row + i.
+    offsets, targets, weights, output, num_nodes, _ = _shared
+    inf = float('inf')
+    for i, source in enumerate(source_ids):
+        distances = [inf] * num_nodes
+        settled = bytearray(num_nodes)
+        distances[source] = 0
+        heap = [(0, source)]
+        while heap:
+            dist, u = heapq.heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            lo, hi = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[lo:hi], weights[lo:hi]):
+                alternative_route = dist + weight
+                if alternative_route < distances[v]:
+                    distances[v] = alternative_route
+                    heapq.heappush(heap, (alternative_route, v))
+        row = (first_row + i) * num_nodes
+        output[row:row + num_nodes] = array('d', distances)
+    return len(source_ids)
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+import instrumentation
+
+
+class QueryCache:
+    # Bounded LRU cache of query results for one Graph.
+    # Entries are stamped with the graph's mutation version: the first lookup at a new
+    # version drops everything older, since it can never be returned again. The LRU
+    # therefore only ever holds results for the current graph. maxsize=0 disables caching.
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.version = None  # Graph version of the current entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def get_or_compute(self, key, compute, *args, version=None):
+        # Return the cached result for 'key', or compute(*args), store and return it.
+        if version != self.version:
+            if self._entries:
+                instrumentation.count('query_cache.stale_dropped', len(self._entries))
+                self._entries.clear()
+            self.version = version
+        entry = self._entries.get(key, self._MISSING)
+        if entry is not self._MISSING:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            instrumentation.count('query_cache.hits')
+            return entry
+        self.misses += 1
+        instrumentation.count('query_cache.misses')
+        result = compute(*args)
+        if self.maxsize > 0:
+            self._entries[key] = result
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                instrumentation.count('query_cache.evictions')
+        return result
+
+
+    def clear(self):
+        self._entries.clear()
+
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+    def __len__(self):
+        return len(self._entries)
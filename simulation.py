@@ -0,0 +1,217 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import maze_generator
+from maze_game import MazeGame
+
+# (nodes, edges, start, end) of the demo maze from main.py, used when no maze is given.
+DEFAULT_MAZE = (
+    ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I'],
+    [('A', 'B', 5), ('A', 'C', 2),
+     ('B', 'D', 1), ('B', 'E', 3),
+     ('C', 'F', 4), ('D', 'F', 6),
+     ('E', 'G', 7), ('F', 'H', 2),
+     ('G', 'I', 4), ('H', 'I', 3)],
+    'A',
+    'I',
+)
+
+
+class MazeSession:
+    # Headless driver for one MazeGame: the turn logic of MazeGame.play_game
+    # without input() or print. A turn is start_turn() followed by finish_turn(),
+    # so callers (policies, servers) decide the move after seeing the new maze.
+
+    def __init__(self, game):
+        self.game = game
+        self.position = game.start
+        self.turns = 0
+        self.moves = 0
+        self.distance_travelled = 0
+        self.powers_used = []
+        self.finished = game.start == game.end
+
+
+    def start_turn(self, power=None, teleport_target=None):
+        # Phase 1: optional power (a teleport needs a target), then the graph dynamics.
+        # A malformed request (e.g. an unhashable power or target) raises before the
+        # session changes: the target is checked before the power's charge is spent.
+        valid_target = power == 'teleport' and self.game.is_valid_teleport(self.position, teleport_target)
+        activated = self.game.activate_power(power) if power else None
+        self.turns += 1
+        if activated:
+            self.powers_used.append(activated)
+        if activated == 'teleport' and valid_target:
+            self.position = teleport_target
+            if self.position == self.game.end:
+                self.finished = True
+                return self.finished
+        self.game.apply_dynamics(block_dynamics=(activated == 'block_dynamics'))
+        return self.finished
+
+
+    def finish_turn(self, move):
+        # Phase 2: move along an edge (an invalid move leaves the player in place).
+        if move is not None and self.game.is_valid_move(self.position, move):
+            self.distance_travelled += self.game.graph.weights[(self.position, move)]
+            self.position = move
+            self.moves += 1
+        if self.position == self.game.end:
+            self.finished = True
+        return self.finished
+
+
+#-----------------------------Agent policies:
+# A policy has choose_power(session, rng) -> (power or None, teleport target or None)
+# and choose_move(session, rng) -> neighbor of session.position (or None to stay).
+
+class RandomPolicy:
+    # Moves to a uniformly random neighbor and never uses powers.
+
+    def choose_power(self, session, rng):
+        return None, None
+
+    def choose_move(self, session, rng):
+        neighbors = session.game.graph.graph.get(session.position)
+        return rng.choice(neighbors) if neighbors else None
+
+
+class GreedyPolicy:
+    # Takes the next hop of the current shortest path to the goal and never uses powers.
+
+    def choose_power(self, session, rng):
+        return None, None
+
+    def choose_move(self, session, rng):
+        # The goal-rooted shortest-path tree stores each node's next hop toward the goal
+        return session.game.goal_paths.parents.get(session.position)
+
+
+class PowerAwarePolicy(GreedyPolicy):
+    # Greedy moves, plus: block the dynamics when the goal is one hop away, and
+    # teleport when a candidate is less than half as far from the goal.
+
+    def choose_power(self, session, rng):
+        game = session.game
+        if game.powers['block_dynamics'] > 0 and game.goal_paths.parents.get(session.position) == game.end:
+            return 'block_dynamics', None
+        if game.powers['teleport'] > 0:
+            candidates = game.teleport_candidates(session.position, limit=1)  # Closest to the goal first
+            if candidates and game.distance_to_goal(candidates[0]) < game.distance_to_goal(session.position) / 2:
+                return 'teleport', candidates[0]
+        return None, None
+
+
+POLICIES = {
+    'random': RandomPolicy,
+    'greedy': GreedyPolicy,
+    'power_aware': PowerAwarePolicy,
+}
+
+
+#-----------------------------Single games and batches:
+
+def play_session(maze, policy='greedy', seed=0, max_turns=1000):
+    # Play one seeded game headlessly. 'maze' is (nodes, edges, start, end);
+    # 'policy' is a name from POLICIES or a policy object. Returns a result dict.
+    nodes, edges, start, end = maze
+    game = MazeGame(seed=seed, verbose=False)
+    game.setup_game(nodes, edges, start, end)
+    session = MazeSession(game)
+    agent = POLICIES[policy]() if isinstance(policy, str) else policy
+    rng = random.Random(f"policy-{seed}")  # Separate stream from the maze dynamics
+
+    started = time.perf_counter()
+    while not session.finished and session.turns < max_turns:
+        power, teleport_target = agent.choose_power(session, rng)
+        if not session.start_turn(power, teleport_target):
+            session.finish_turn(agent.choose_move(session, rng))
+
+    return {
+        'seed': seed,
+        'won': session.finished,
+        'turns': session.turns,
+        'moves': session.moves,
+        'distance': session.distance_travelled,
+        'powers_used': len(session.powers_used),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+_worker_maze = None  # Maze shared by every game of one worker process
+
+
+def _init_worker(maze):
+    global _worker_maze
+    _worker_maze = maze
+
+
+def _play_task(task):
+    policy, seed, max_turns = task
+    return play_session(_worker_maze, policy, seed, max_turns)
+
+
+def run_batch(maze=DEFAULT_MAZE, games=1000, policy='greedy', workers=None, max_turns=1000, base_seed=0):
+    # Simulate 'games' games (seeds base_seed, base_seed + 1, ...) across a process pool.
+    # workers=1 runs in-process. Returns the summary from summarize().
+    tasks = [(policy, base_seed + i, max_turns) for i in range(games)]
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker(maze)
+        results = [_play_task(task) for task in tasks]
+    else:
+        pool_size = workers or os.cpu_count() or 1
+        chunksize = max(1, games // (4 * pool_size))
+        with ProcessPoolExecutor(max_workers=pool_size, initializer=_init_worker, initargs=(maze,)) as pool:
+            results = list(pool.map(_play_task, tasks, chunksize=chunksize))
+    return summarize(results, time.perf_counter() - started)
+
+
+def summarize(results, elapsed):
+    # Throughput and outcome statistics for a list of play_session() results.
+    games = len(results)
+    turns = sorted(result['turns'] for result in results)
+    wins = sum(result['won'] for result in results)
+    total_turns = sum(turns)
+    return {
+        'games': games,
+        'wins': wins,
+        'win_rate': wins / games if games else 0.0,
+        'mean_turns': total_turns / games if games else 0.0,
+        'median_turns': turns[games // 2] if games else 0,
+        'p95_turns': turns[min(games - 1, int(games * 0.95))] if games else 0,
+        'mean_distance': sum(result['distance'] for result in results) / games if games else 0.0,
+        'powers_used': sum(result['powers_used'] for result in results),
+        'elapsed_seconds': elapsed,
+        'games_per_second': games / elapsed if elapsed else 0.0,
+        'turns_per_second': total_turns / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless MazeGame batch simulation.")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy')
+    parser.add_argument('--workers', type=int, default=None, help="process count (default: all cores, 1 = in-process)")
+    parser.add_argument('--max-turns', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--maze', metavar='WIDTHxHEIGHT', help="play a generated maze instead of the 9-node default")
+    parser.add_argument('--algorithm', choices=maze_generator.ALGORITHMS, default='kruskal')
+    parser.add_argument('--braid', type=float, default=0.1, help="fraction of dead ends opened into loops")
+    args = parser.parse_args()
+
+    maze = DEFAULT_MAZE
+    if args.maze:
+        width, height = (int(size) for size in args.maze.lower().split('x'))
+        maze = maze_generator.generate_maze(width, height, args.algorithm, args.braid, (1, 10), seed=args.seed)
+    summary = run_batch(maze=maze, games=args.games, policy=args.policy, workers=args.workers,
+                        max_turns=args.max_turns, base_seed=args.seed)
+    for key, value in summary.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from connectivity import DynamicConnectivity
+from cow_graph import CowGraph
+from graph import Graph
+
+
+def reachable(graph, start, skip=None):
+    # Nodes reachable from 'start', optionally without using the edge 'skip' (both directions).
+    seen = {start}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        for neighbor in graph.graph.get(node, ()):
+            if skip in ((node, neighbor), (neighbor, node)) or neighbor in seen:
+                continue
+            seen.add(neighbor)
+            stack.append(neighbor)
+    return seen
+
+
+class DynamicConnectivityTest(unittest.TestCase):
+    # Randomized differential test: is_bridge() and connected() against brute-force searches.
+
+    def check(self, graph, index):
+        nodes = list(graph.graph)
+        for node1, node2 in graph.weights:
+            if node1 != node2:
+                self.assertEqual(index.is_bridge(node1, node2),
+                                 node2 not in reachable(graph, node1, skip=(node1, node2)), (node1, node2))
+        for node in nodes[:5]:
+            component = reachable(graph, node)
+            for other in nodes:
+                self.assertEqual(index.connected(node, other), other in component, (node, other))
+
+
+    def churn(self, graph, index, rng, nodes, steps):
+        for _ in range(steps):
+            if rng.random() < 0.5 or not graph.weights:
+                graph.add_edge(rng.randrange(nodes), rng.randrange(nodes), rng.randint(1, 5))
+            else:
+                graph.remove_edge(*rng.choice(list(graph.weights)))
+            self.check(graph, index)
+
+
+    def test_random_churn(self):
+        for seed in range(60):
+            rng = random.Random(seed)
+            nodes = rng.randint(2, 16)
+            graph = Graph(verbose=False, cache_size=0)
+            graph.add_nodes_from(range(nodes))
+            graph.add_edges_from((rng.randrange(nodes), rng.randrange(nodes)) for _ in range(rng.randint(0, 2 * nodes)))
+            index = DynamicConnectivity(graph)
+            self.check(graph, index)
+            self.churn(graph, index, rng, nodes, 80)
+
+
+    def test_copies_on_cow_graphs(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            graph = Graph(verbose=False, cache_size=0)
+            graph.add_edges_from((rng.randrange(12), rng.randrange(12)) for _ in range(24))
+            index = DynamicConnectivity(graph)
+            bridges = {edge for edge in graph.weights if index.is_bridge(*edge)}
+            for fork_seed in range(3):
+                fork = CowGraph(graph)
+                copy = index.copy(fork)
+                self.churn(fork, copy, random.Random(fork_seed), 12, 40)
+            self.check(graph, index)  # The shared base index is unchanged
+            self.assertEqual(bridges, {edge for edge in graph.weights if index.is_bridge(*edge)})
+
+
+    def test_tokens_stay_bounded(self):
+        rng = random.Random(1)
+        graph = Graph(verbose=False, cache_size=0)
+        graph.add_edges_from((i, (i + 1) % 30) for i in range(30))
+        index = DynamicConnectivity(graph)
+        for _ in range(3000):
+            if rng.random() < 0.5:
+                graph.add_edge(rng.randrange(30), rng.randrange(30))
+            elif graph.weights:
+                graph.remove_edge(*rng.choice(list(graph.weights)))
+        self.assertLessEqual(len(index._group), 2 * 30 + len(index._size))
+        self.check(graph, index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import random
+import unittest
+
+from cow_graph import CowGraph
+from graph import Graph
+from incremental_scc import IncrementalSCC
+
+
+def nodes_of(graph):
+    # Every node of a directed graph, including targets that have no adjacency entry.
+    return set(graph.graph) | {node2 for (_, node2) in graph.weights}
+
+
+def reachable(graph, start):
+    seen = {start}
+    stack = [start]
+    while stack:
+        for neighbor in graph._neighbors(stack.pop()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                stack.append(neighbor)
+    return seen
+
+
+class IncrementalSCCTest(unittest.TestCase):
+    # Randomized differential test: components against Graph.tarjan_scc, reaches() and
+    # reachable_from_all() against brute-force searches.
+
+    def check(self, graph, index):
+        keys = len(graph.graph)
+        nodes = nodes_of(graph)
+        expected = {frozenset(scc) for scc in graph.tarjan_scc()}
+        components = {}
+        for node in nodes:
+            components.setdefault(index.component(node), set()).add(node)
+        self.assertEqual({frozenset(members) for members in components.values()}, expected)
+        reach = {node: reachable(graph, node) for node in nodes}
+        for node in nodes:
+            for other in nodes:
+                self.assertEqual(index.reaches(node, other), other in reach[node], (node, other))
+            self.assertEqual(index.reachable_from_all(node), all(node in reach[other] for other in nodes), node)
+        self.assertEqual(len(graph.graph), keys)  # Queries never add nodes to the graph
+
+
+    def churn(self, graph, index, rng, nodes, steps):
+        for _ in range(steps):
+            choice = rng.random()
+            if choice < 0.45:
+                graph.add_edge(rng.randrange(nodes), rng.randrange(nodes))
+            elif choice < 0.9:
+                if graph.weights:
+                    graph.remove_edge(*rng.choice(list(graph.weights)))
+            else:
+                graph.add_node(rng.randrange(nodes + 3))
+            self.check(graph, index)
+
+
+    def test_random_churn(self):
+        for seed in range(150):
+            rng = random.Random(seed)
+            nodes = rng.randint(2, 12)
+            graph = Graph(directed=True, verbose=False, cache_size=0)
+            graph.add_edges_from((rng.randrange(nodes), rng.randrange(nodes)) for _ in range(rng.randint(0, nodes)))
+            index = IncrementalSCC(graph)
+            self.check(graph, index)
+            self.churn(graph, index, rng, nodes, 40)
+
+
+    def test_copies_on_cow_graphs(self):
+        for seed in range(30):
+            rng = random.Random(seed)
+            graph = Graph(directed=True, verbose=False, cache_size=0)
+            graph.add_edges_from((rng.randrange(10), rng.randrange(10)) for _ in range(15))
+            index = IncrementalSCC(graph)
+            for fork_seed in range(2):
+                fork = CowGraph(graph)
+                copy = index.copy(fork)
+                self.churn(fork, copy, random.Random(fork_seed), 10, 25)
+            self.check(graph, index)
+
+
+    def test_dag_search_above_closure_limit(self):
+        for seed in range(40):
+            rng = random.Random(seed)
+            graph = Graph(directed=True, verbose=False, cache_size=0)
+            graph.add_edges_from((rng.randrange(12), rng.randrange(12)) for _ in range(10))
+            index = IncrementalSCC(graph)
+            index._CLOSURE_LIMIT = 3
+            self.check(graph, index)
+            self.churn(graph, index, rng, 12, 30)
+
+
+    def test_isolated_and_target_only_nodes(self):
+        graph = Graph(directed=True, verbose=False)
+        index = IncrementalSCC(graph)
+        graph.add_edge('a', 'b')
+        graph.add_node('z')
+        self.assertFalse(index.reachable_from_all('b'))
+        graph.remove_edge('a', 'b')  # 'b' was only a target: it leaves the graph
+        self.assertIsNone(index.component('b'))
+        self.check(graph, index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+from collections import deque
+
+
+# Explicit-stack traversal engine shared by Graph and CompactGraph.
+# 'neighbors' is a callable node -> iterable of neighbors. Every function keeps its
+# state in locals, so calls are re-entrant and never hit Python's recursion limit;
+# each runs in O(V + E).
+
+
+def dfs_path(neighbors, start, end, visited=None):
+    # Depth-first search from 'start'; returns the stack path to 'end' or [] if unreachable.
+    if visited is None:
+        visited = set()
+    visited.add(start)
+    if start == end:
+        return [start]
+
+    path = [start]
+    neighbor_iters = [iter(neighbors(start))]
+    while neighbor_iters:
+        for neighbor in neighbor_iters[-1]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                path.append(neighbor)
+                if neighbor == end:
+                    return path
+                neighbor_iters.append(iter(neighbors(neighbor)))
+                break
+        else:
+            neighbor_iters.pop()
+            path.pop()
+    return []
+
+
+def dfs_preorder(neighbors, root, visited):
+    # Nodes reachable from 'root' (and not yet in 'visited') in depth-first preorder.
+    visited.add(root)
+    order = [root]
+    neighbor_iters = [iter(neighbors(root))]
+    while neighbor_iters:
+        for neighbor in neighbor_iters[-1]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                order.append(neighbor)
+                neighbor_iters.append(iter(neighbors(neighbor)))
+                break
+        else:
+            neighbor_iters.pop()
+    return order
+
+
+def connected_components(nodes, neighbors):
+    # One preorder list per component, in order of the first node of 'nodes' that hits it.
+    visited = set()
+    components = []
+    for node in nodes:
+        if node not in visited:
+            components.append(dfs_preorder(neighbors, node, visited))
+    return components
+
+
+def strongly_connected_components(nodes, neighbors):
+    # Tarjan's algorithm with an explicit call stack; SCCs come out in completion order.
+    indices = {}  # Discovery time of each node
+    low_link = {}  # Lowest discovery time reachable from the node's subtree
+    stack = []  # Nodes of SCCs still being built
+    on_stack = set()
+    sccs = []
+    index = 0
+
+    for root in nodes:
+        if root in indices:
+            continue
+        indices[root] = low_link[root] = index
+        index += 1
+        stack.append(root)
+        on_stack.add(root)
+        call_stack = [(root, iter(neighbors(root)))]
+
+        while call_stack:
+            node, neighbor_iter = call_stack[-1]
+            for neighbor in neighbor_iter:
+                if neighbor not in indices:  # Tree edge: "recurse" into the neighbor
+                    indices[neighbor] = low_link[neighbor] = index
+                    index += 1
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    call_stack.append((neighbor, iter(neighbors(neighbor))))
+                    break
+                elif neighbor in on_stack:  # The neighbor is part of the current SCC
+                    low_link[node] = min(low_link[node], indices[neighbor])
+            else:
+                call_stack.pop()
+                if call_stack:
+                    parent = call_stack[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+                if low_link[node] == indices[node]:  # node is the root of an SCC
+                    scc = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.remove(w)
+                        scc.append(w)
+                        if w == node:
+                            break
+                    sccs.append(scc)
+    return sccs
+
+
+def bfs_path(neighbors, start, end):
+    # Unweighted shortest path from 'start' to 'end' via parent pointers ([] if unreachable).
+    if start == end:
+        return [start]
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in neighbors(node):
+            if neighbor not in parents:
+                parents[neighbor] = node
+                if neighbor == end:
+                    return _walk_back(parents, end)
+                queue.append(neighbor)
+    return []
+
+
+def bidirectional_bfs_path(neighbors, predecessors, start, end):
+    # Unweighted shortest path, searching forward from 'start' and backward from 'end'
+    # one whole level at a time (always the smaller frontier) until the searches meet.
+    # 'predecessors' gives incoming neighbors; pass 'neighbors' again for undirected graphs.
+    if start == end:
+        return [start]
+    forward_parents = {start: None}
+    backward_parents = {end: None}
+    forward_frontier = [start]
+    backward_frontier = [end]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = _expand_level(neighbors, forward_frontier, forward_parents, backward_parents)
+        else:
+            backward_frontier, meeting = _expand_level(predecessors, backward_frontier, backward_parents, forward_parents)
+        if meeting is not None:
+            path = _walk_back(forward_parents, meeting)
+            node = backward_parents[meeting]
+            while node is not None:
+                path.append(node)
+                node = backward_parents[node]
+            return path
+    return []
+
+
+def _expand_level(neighbors, frontier, parents, other_parents):
+    # Expand one BFS level; returns (next frontier, meeting node or None).
+    next_frontier = []
+    for node in frontier:
+        for neighbor in neighbors(node):
+            if neighbor not in parents:
+                parents[neighbor] = node
+                if neighbor in other_parents:
+                    return next_frontier, neighbor
+                next_frontier.append(neighbor)
+    return next_frontier, None
+
+
+def _walk_back(parents, node):
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path